@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Room, Proctor, Exam, TimeSlot
+from .models import Room, Proctor, Exam, TimeSlot, ScheduleJob, ModelVersion, CachedSolution, SolveHistory
 
 @admin.register(Room)
 class RoomAdmin(admin.ModelAdmin):
@@ -23,4 +23,23 @@ class ExamAdmin(admin.ModelAdmin):
 class TimeSlotAdmin(admin.ModelAdmin):
     list_display = ('start_time', 'end_time', 'room', 'exam')
     list_filter = ('start_time', 'room')
-    search_fields = ('exam__name', 'room__name')
\ No newline at end of file
+    search_fields = ('exam__name', 'room__name')
+
+@admin.register(ScheduleJob)
+class ScheduleJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'status', 'created_at', 'started_at', 'finished_at')
+    list_filter = ('status',)
+
+@admin.register(ModelVersion)
+class ModelVersionAdmin(admin.ModelAdmin):
+    list_display = ('label', 'version', 'updated_at')
+
+@admin.register(CachedSolution)
+class CachedSolutionAdmin(admin.ModelAdmin):
+    list_display = ('key', 'hits', 'created_at', 'last_used_at')
+    readonly_fields = ('result',)
+
+@admin.register(SolveHistory)
+class SolveHistoryAdmin(admin.ModelAdmin):
+    list_display = ('created_at', 'engine', 'status', 'cached', 'exams', 'variables', 'wall_time', 'gap')
+    list_filter = ('engine', 'status', 'cached')
@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class ExamSchedulerConfig(AppConfig):
+    name = 'backend.apps.exam_scheduler'
+
+    def ready(self):
+        # Connecter les signaux d'invalidation du cache des statistiques
+        from . import signals  # noqa: F401
@@ -0,0 +1,212 @@
+import logging
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+logger = logging.getLogger(__name__)
+
+# Intervalle de vérification des demandes d'arrêt (ExamScheduler.stop) pendant
+# la résolution parallèle des composantes
+STOP_POLL_SECONDS = 0.2
+
+
+def conflict_components(instance):
+    """
+    Composantes connexes du graphe des conflits : deux examens sont reliés
+    s'ils partagent la même promotion ou la même filière (contraintes 6 et 7).
+    Retourne une liste de listes d'indices d'examens.
+    """
+    parent = list(range(len(instance.exams)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for group in instance.conflict_groups():
+        for e_idx in group[1:]:
+            parent[find(e_idx)] = find(group[0])
+
+    components = {}
+    for e_idx in range(len(instance.exams)):
+        components.setdefault(find(e_idx), []).append(e_idx)
+    return list(components.values())
+
+
+def partition_rooms(components, instance):
+    """
+    Répartir les salles entre les composantes. Chaque composante reçoit d'abord
+    une salle assez grande pour son plus gros examen, puis les salles restantes
+    vont à la composante la plus chargée (minutes d'examen par salle reçue).
+    Retourne None si aucune répartition n'est possible.
+    """
+    capacities = instance.capacities.tolist()
+    if len(capacities) < len(components):
+        return None
+
+    room_order = sorted(range(len(capacities)), key=lambda r_idx: capacities[r_idx], reverse=True)
+    largest_exam = [int(instance.participants[component].max()) for component in components]
+    demand = [int(instance.durations[component].sum()) for component in components]
+
+    pools = [[] for _ in components]
+    component_order = sorted(range(len(components)), key=lambda c_idx: largest_exam[c_idx], reverse=True)
+    for c_idx, r_idx in zip(component_order, room_order):
+        if capacities[r_idx] < largest_exam[c_idx]:
+            return None
+        pools[c_idx].append(r_idx)
+
+    for r_idx in room_order[len(components):]:
+        c_idx = max(range(len(components)), key=lambda c: demand[c] / len(pools[c]))
+        pools[c_idx].append(r_idx)
+    return pools
+
+
+def split_capacity(capacity, demand):
+    """
+    Répartir `capacity` entre les parts proportionnellement à `demand` (méthode
+    des plus forts restes), avec au moins 1 par part : la somme vaut exactement
+    `capacity`. Retourne None s'il y a plus de parts que de capacité.
+    """
+    if capacity < len(demand):
+        return None
+    extra = capacity - len(demand)
+    total = sum(demand)
+    shares = [1 + extra * part // total for part in demand]
+    by_remainder = sorted(range(len(demand)), key=lambda i: extra * demand[i] % total, reverse=True)
+    for i in by_remainder[:capacity - sum(shares)]:
+        shares[i] += 1
+    return shares
+
+
+def component_solver_params(solver_params, components, workers):
+    """
+    Paramètres du solveur de chaque composante. Les composantes sont résolues par
+    vagues de `workers` processus : chaque vague reçoit une part égale du temps
+    limite de la requête, et les threads du solveur sont partagés entre les processus.
+    """
+    params = dict(solver_params)
+    if params.get('time_limit') is not None:
+        params['time_limit'] = float(params['time_limit']) / math.ceil(components / workers)
+    params['num_workers'] = max(1, int(params.get('num_workers') or os.cpu_count() or 1) // workers)
+    return params
+
+
+def solve_component(instance, engine, proctor_capacity, hints, minimal_change, solver_params, stop_event):
+    """
+    Placer les examens d'une composante (sous-problème ProblemInstance) dans un
+    processus séparé. La résolution est interrompue dès que `stop_event`
+    (événement partagé entre processus) est levé.
+    """
+    from .optimizer import ExamScheduler
+
+    scheduler = ExamScheduler.from_instance(
+        instance, engine=engine, proctor_capacity=proctor_capacity,
+        hints=hints, minimal_change=minimal_change, solver_params=solver_params
+    )
+    finished = threading.Event()
+
+    def watch_stop():
+        while not finished.is_set():
+            if stop_event.wait(STOP_POLL_SECONDS):
+                scheduler.stop()
+                return
+
+    watcher = threading.Thread(target=watch_stop, name='component-stop', daemon=True)
+    watcher.start()
+    try:
+        result = scheduler.create_timetable()
+    finally:
+        finished.set()
+        watcher.join()
+    result['report'] = scheduler.report
+    return result
+
+
+def solve_decomposed(scheduler, max_workers=None):
+    """
+    Placer les examens de chaque composante indépendante du problème dans un
+    processus séparé puis fusionner les résultats. Les surveillants sont
+    affectés ensuite sur l'emploi du temps fusionné. Retourne None si le
+    problème ne se décompose pas (une seule composante ou salles impossibles
+    à répartir) ou si une composante n'a pas de solution : la répartition des
+    salles n'étant qu'une heuristique, le modèle complet est alors résolu.
+    Retourne aussi None si la résolution est interrompue (scheduler.stop()) :
+    les processus des composantes sont arrêtés, l'appelant vérifie scheduler.stopped.
+    """
+    components = conflict_components(scheduler.instance)
+    if len(components) < 2:
+        return None
+
+    room_pools = partition_rooms(components, scheduler.instance)
+    if room_pools is None:
+        return None
+
+    # Les surveillants restent communs : chaque composante reçoit une part du
+    # nombre d'examens simultanés proportionnelle à sa charge, et la somme des parts
+    # ne dépasse pas le nombre de surveillants (inutile s'il y en a un par examen)
+    if scheduler.proctor_capacity >= len(scheduler.exams):
+        proctor_capacities = [len(component) for component in components]
+    else:
+        demand = [int(scheduler.instance.durations[component].sum()) for component in components]
+        proctor_capacities = split_capacity(scheduler.proctor_capacity, demand)
+        if proctor_capacities is None:
+            return None
+
+    workers = min(max_workers or os.cpu_count() or 1, len(components))
+    solver_params = component_solver_params(scheduler.solver_params, len(components), workers)
+
+    # Chaque processus reçoit un instantané compact de sa composante. stop() est
+    # appelé depuis un autre thread de ce processus : il est relayé aux processus
+    # des composantes par un événement partagé
+    with multiprocessing.Manager() as manager, ProcessPoolExecutor(max_workers=workers) as executor:
+        stop_event = manager.Event()
+        futures = [
+            executor.submit(
+                solve_component,
+                scheduler.instance.subset(component, room_pool),
+                scheduler.engine,
+                proctor_capacity,
+                {
+                    scheduler.exams[e_idx].id: (
+                        scheduler.rooms[scheduler.hints[e_idx][0]].id,
+                        scheduler.time_slots[scheduler.hints[e_idx][1]].start_time,
+                    )
+                    for e_idx in component if e_idx in scheduler.hints
+                },
+                scheduler.minimal_change,
+                solver_params,
+                stop_event,
+            )
+            for component, room_pool, proctor_capacity in zip(components, room_pools, proctor_capacities)
+        ]
+        pending = set(futures)
+        while pending and not scheduler.stopped:
+            _, pending = wait(pending, timeout=STOP_POLL_SECONDS, return_when=FIRST_COMPLETED)
+        if scheduler.stopped:
+            # Les composantes en attente ne sont pas lancées, celles en cours
+            # s'arrêtent à la prochaine vérification de l'événement
+            stop_event.set()
+            executor.shutdown(cancel_futures=True)
+            logger.info("Résolution décomposée interrompue")
+            return None
+        partial_results = [future.result() for future in futures]
+
+    # Fusion des résultats des composantes
+    presolve_stats = {}
+    for partial in partial_results:
+        for key, value in partial['presolve'].items():
+            presolve_stats[key] = presolve_stats.get(key, 0) + value
+
+    # Rapports de résolution des composantes
+    scheduler.report['components'] = [partial['report'] for partial in partial_results]
+
+    failed = [c_idx for c_idx, partial in enumerate(partial_results) if partial['status'] != 'success']
+    if failed:
+        logger.info("Composantes sans solution %s sur %d : résolution du modèle complet", failed, len(components))
+        return None
+
+    results = [item for partial in partial_results for item in partial['results']]
+    return {'status': 'success', 'results': results, 'presolve': presolve_stats, 'components': len(components)}
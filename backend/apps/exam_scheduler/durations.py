@@ -0,0 +1,35 @@
+import re
+
+# Formats acceptés : "2h30", "2h", "2H05", "90" (minutes)
+DURATION_PATTERN = re.compile(r'^\s*(?:(\d+)\s*[hH]\s*(\d{1,2})?|(\d+))\s*$')
+
+
+def parse_duration(value):
+    """
+    Convertir une durée ("2h30", "1h", "90" ou un entier de minutes) en nombre
+    de minutes. Lève ValueError si la durée est invalide ou nulle.
+    """
+    if isinstance(value, int) and not isinstance(value, bool):
+        minutes = value
+    else:
+        match = DURATION_PATTERN.match(str(value))
+        if not match:
+            raise ValueError(f"Invalid duration: {value!r}")
+        hours, extra, only_minutes = match.groups()
+        if only_minutes is not None:
+            minutes = int(only_minutes)
+        else:
+            if extra is not None and int(extra) >= 60:
+                raise ValueError(f"Invalid duration: {value!r}")
+            minutes = int(hours) * 60 + int(extra or 0)
+    if minutes <= 0:
+        raise ValueError(f"Duration must be positive: {value!r}")
+    return minutes
+
+
+def format_duration(minutes):
+    """Écrire une durée en minutes au format "2h30" """
+    if minutes is None:
+        return None
+    return f"{minutes // 60}h{minutes % 60:02d}"
+
@@ -1,6 +1,7 @@
 from datetime import datetime, timedelta
 from django.utils import timezone
-from backend.apps.exam_scheduler.models import Room, Proctor, Exam, TimeSlot
+from backend.apps.exam_scheduler.models import Room, Proctor, Exam
+from backend.apps.exam_scheduler.timeslots import generate_timeslots
 from random import choice
 
 def create_sample_fixtures():
@@ -39,7 +40,7 @@ def create_sample_fixtures():
         Exam.objects.create(
             name=f"Examen {i}",
             date=timezone.now() + timedelta(days=i),
-            duration="2h00",
+            duration_minutes=120,
             participants=25 + i*5,
             level=f"L{i}",
             department=["Informatique", "Mathématiques", "Physique"][i-1]
@@ -51,31 +52,14 @@ def create_sample_fixtures():
 
 def create_default_timeslots():
     """
-    Crée des créneaux horaires par défaut
+    Crée des créneaux horaires par défaut : 4 jours à partir d'aujourd'hui,
+    de 8h à 18h, par intervalles de 30 minutes (sans doublon si relancé)
     """
-    # Supprimer les créneaux existants
-    TimeSlot.objects.all().delete()
+    start_date = timezone.localdate()
+    created, _ = generate_timeslots(start_date, start_date + timedelta(days=3))
 
-    # Date de début (aujourd'hui)
-    start_date = timezone.now().replace(hour=8, minute=0, second=0, microsecond=0)
-
-    # Créer des créneaux pour 3 jours, de 8h à 18h, avec des intervalles de 30 minutes
-    timeslots_created = 0
-    for day in range(4):  # 4 jours
-        day_start = start_date + timedelta(days=day)
-        for hour in range(8, 18):  # De 8h à 18h
-            for minute in [0, 30]:  # Intervalles de 30 minutes
-                start_time = day_start.replace(hour=hour, minute=minute)
-                end_time = start_time + timedelta(minutes=30)
-
-                TimeSlot.objects.create(
-                    start_time=start_time,
-                    end_time=end_time
-                )
-                timeslots_created += 1
-
-    print(f"Créé {timeslots_created} créneaux horaires par défaut")
-    return timeslots_created
+    print(f"Créé {len(created)} créneaux horaires par défaut")
+    return len(created)
 
 def generate_fixtures():
     """Générer des données d'exemple pour l'application"""
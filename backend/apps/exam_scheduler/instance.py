@@ -0,0 +1,138 @@
+from collections import namedtuple
+from datetime import timedelta
+
+import numpy as np
+
+# Colonnes lues pour chaque table (dans cet ordre par values_list)
+EXAM_FIELDS = ('id', 'duration_minutes', 'level', 'department', 'participants')
+ROOM_FIELDS = ('id', 'capacity')
+PROCTOR_FIELDS = ('id', 'department', 'availability')
+TIME_SLOT_FIELDS = ('id', 'start_time', 'end_time')
+
+# Lignes légères et sérialisables (pickle) qui remplacent les objets Django
+ExamRow = namedtuple('ExamRow', EXAM_FIELDS)
+RoomRow = namedtuple('RoomRow', ROOM_FIELDS)
+ProctorRow = namedtuple('ProctorRow', PROCTOR_FIELDS)
+TimeSlotRow = namedtuple('TimeSlotRow', TIME_SLOT_FIELDS)
+
+
+def _rows(row_class, items):
+    """Convertir des tuples (values_list) ou des objets (modèles, SimpleNamespace) en lignes"""
+    rows = []
+    for item in items:
+        if isinstance(item, row_class):
+            rows.append(item)
+        elif isinstance(item, tuple):
+            rows.append(row_class._make(item))
+        else:
+            rows.append(row_class._make(getattr(item, field, None) for field in row_class._fields))
+    return rows
+
+
+def _codes(values):
+    """Codes entiers (dans l'ordre de première apparition) et valeurs correspondantes"""
+    names = {}
+    codes = np.fromiter((names.setdefault(value, len(names)) for value in values), dtype=np.int32, count=len(values))
+    return codes, list(names)
+
+
+def code_groups(codes):
+    """Indices regroupés par code, ex: [0, 1, 0] -> [[0, 2], [1]]"""
+    if not len(codes):
+        return []
+    order = np.argsort(codes, kind='stable')
+    bounds = np.flatnonzero(np.diff(codes[order])) + 1
+    return [group.tolist() for group in np.split(order, bounds)]
+
+
+class ProblemInstance:
+    """
+    Instantané compact d'un problème de planification, lu une seule fois :
+    - des lignes légères (namedtuple) pour revenir aux identifiants ;
+    - des tableaux NumPy pour les boucles de construction des modèles :
+      durées, participants, capacités, débuts et fins des créneaux en minutes,
+      codes entiers des promotions et des filières.
+    Les créneaux sont triés par heure de début, un seul par heure de début.
+    L'instantané se sérialise à faible coût vers les processus de résolution.
+    """
+
+    def __init__(self, exams, rooms, proctors, time_slots):
+        self.exams = _rows(ExamRow, exams)
+        self.rooms = _rows(RoomRow, rooms)
+        self.proctors = _rows(ProctorRow, proctors)
+        self.time_slots = []
+        for time_slot in sorted(_rows(TimeSlotRow, time_slots), key=lambda time_slot: time_slot.start_time):
+            if not self.time_slots or self.time_slots[-1].start_time != time_slot.start_time:
+                self.time_slots.append(time_slot)
+
+        # Examens
+        self.exam_ids = np.array([exam.id for exam in self.exams], dtype=np.int64)
+        self.durations = np.array([exam.duration_minutes for exam in self.exams], dtype=np.int64)
+        self.participants = np.array([exam.participants or 0 for exam in self.exams], dtype=np.int64)
+        self.levels, self.level_names = _codes([exam.level for exam in self.exams])
+        self.departments, self.department_names = _codes([exam.department for exam in self.exams])
+
+        # Salles et surveillants
+        self.room_ids = np.array([room.id for room in self.rooms], dtype=np.int64)
+        self.capacities = np.array([room.capacity for room in self.rooms], dtype=np.int64)
+        self.proctor_ids = np.array([proctor.id for proctor in self.proctors], dtype=np.int64)
+
+        # Créneaux : début et fin en minutes depuis le premier créneau et jour (ordinal)
+        self.slot_ids = np.array([time_slot.id for time_slot in self.time_slots], dtype=np.int64)
+        origin = self.time_slots[0].start_time if self.time_slots else None
+        self.start_ticks = np.array(
+            [(time_slot.start_time - origin) // timedelta(minutes=1) for time_slot in self.time_slots], dtype=np.int64
+        )
+        self.end_ticks = np.array(
+            [(time_slot.end_time - origin) // timedelta(minutes=1) for time_slot in self.time_slots], dtype=np.int64
+        )
+        self.slot_days = np.array(
+            [time_slot.start_time.date().toordinal() for time_slot in self.time_slots], dtype=np.int64
+        )
+
+        # Correspondances identifiant -> indice
+        self.exam_index = {exam.id: e_idx for e_idx, exam in enumerate(self.exams)}
+        self.room_index = {room.id: r_idx for r_idx, room in enumerate(self.rooms)}
+        self.slot_index = {time_slot.start_time: t_idx for t_idx, time_slot in enumerate(self.time_slots)}
+
+    def slot_spans(self):
+        """
+        Créneaux occupés par les examens, d'après les heures des créneaux (de durées
+        quelconques) : un examen qui commence au créneau t occupe les créneaux
+        t .. t + n - 1, ceux qui commencent avant sa fin. Retourne (spans, rows), une
+        ligne par durée : spans[rows[e], t] = n pour l'examen e, ou 0 s'il ne peut pas
+        commencer en t (il finirait après le dernier créneau de la journée, ou pendant
+        une interruption entre deux créneaux).
+        """
+        durations, rows = np.unique(self.durations, return_inverse=True)
+        starts, ends = self.start_ticks, self.end_ticks
+        if not len(starts):
+            return np.zeros((len(durations), 0), dtype=np.int64), rows
+
+        # Suites de créneaux sans interruption au sein d'une même journée
+        breaks = (starts[1:] > ends[:-1]) | (self.slot_days[1:] != self.slot_days[:-1])
+        runs = np.concatenate(([0], np.cumsum(breaks)))
+        positions = np.arange(len(starts))
+
+        # last[d, t] = dernier créneau occupé par un examen de durée d qui commence en t
+        exam_ends = starts + durations[:, None]
+        last = np.searchsorted(starts, exam_ends, side='left') - 1
+        fits = (runs[last] == runs) & (exam_ends <= ends[last])
+        return np.where(fits, last - positions + 1, 0), rows
+
+    def conflict_groups(self):
+        """Groupes d'examens qui ne peuvent pas avoir lieu en même temps : même promotion, puis même filière"""
+        return code_groups(self.levels) + code_groups(self.departments)
+
+    def subset(self, exam_indices, room_indices):
+        """Sous-problème restreint à des examens et des salles (sans surveillants), mêmes créneaux"""
+        return ProblemInstance(
+            [self.exams[e_idx] for e_idx in exam_indices],
+            [self.rooms[r_idx] for r_idx in room_indices],
+            [],
+            self.time_slots,
+        )
+
+    def is_complete(self):
+        """Y a-t-il au moins un examen, une salle, un surveillant et un créneau ?"""
+        return bool(self.exams and self.rooms and self.proctors and self.time_slots)
@@ -0,0 +1,227 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import ScheduleJob
+from .services import MissingDataError, ScheduleConflictError, build_scheduler, save_schedule, solve_schedule
+from .versions import bump_versions
+
+logger = logging.getLogger(__name__)
+
+# CP-SAT relâche le GIL pendant la résolution : un pool de threads local suffit
+_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, 'SCHEDULER_JOB_WORKERS', 2),
+    thread_name_prefix='schedule-job',
+)
+
+# Surveillance des jobs : annulations demandées (éventuellement depuis un autre
+# processus) et signe de vie, à intervalle régulier
+POLL_SECONDS = getattr(settings, 'SCHEDULER_JOB_POLL_SECONDS', 2)
+STALE_AFTER = timedelta(seconds=getattr(settings, 'SCHEDULER_JOB_STALE_SECONDS', 60))
+
+# Jobs lancés par ce processus et pas encore terminés, planificateurs en cours
+# de résolution pour pouvoir les interrompre, dernières solutions pas encore
+# enregistrées, thread de surveillance
+_owned = set()
+_running = {}
+_progress = {}
+_running_lock = threading.Lock()
+_monitor = None
+
+
+def submit_job(options):
+    """Enregistrer un job de planification et le lancer dans le pool"""
+    recover_stale_jobs()
+    job = ScheduleJob.objects.create(options=options, heartbeat_at=timezone.now())
+    with _running_lock:
+        _owned.add(job.id)
+    _ensure_monitor()
+    _executor.submit(_run_job, job.id)
+    return job
+
+
+def cancel_job(job):
+    """Demander l'annulation d'un job ; une résolution en cours est interrompue"""
+    ScheduleJob.objects.filter(id=job.id).update(cancel_requested=True)
+    bump_versions(ScheduleJob)
+    job.cancel_requested = True
+    # Le job peut tourner dans un autre processus : son thread de surveillance
+    # verra la demande au prochain passage
+    with _running_lock:
+        scheduler = _running.get(job.id)
+    if scheduler is not None:
+        scheduler.stop()
+
+
+def follow_job(job_id):
+    """
+    Suivre un job depuis la base, quel que soit le processus qui l'exécute :
+    génère ('solution', solution) à chaque nouvelle solution améliorante puis
+    ('result', état final). Lecture seule, à intervalle POLL_SECONDS.
+    """
+    sent = None
+    while True:
+        job = ScheduleJob.objects.filter(id=job_id).only('status', 'progress', 'result', 'error').first()
+        if job is None:
+            return
+        if job.progress is not None and job.progress != sent:
+            sent = job.progress
+            yield 'solution', job.progress
+        if job.is_finished:
+            result = job.result or {}
+            final = {'id': job_id, 'status': job.status, 'error': job.error, 'report': result.get('report')}
+            if job.status == 'succeeded':
+                final['scheduled_exams'] = len(result['results'])
+            yield 'result', final
+            return
+        time.sleep(POLL_SECONDS)
+
+
+def recover_stale_jobs():
+    """
+    Marquer en échec les jobs en attente ou en cours dont le processus s'est
+    arrêté (redémarrage, plantage) : plus de signe de vie depuis STALE_AFTER.
+    Retourne le nombre de jobs récupérés.
+    """
+    now = timezone.now()
+    limit = now - STALE_AFTER
+    with _running_lock:
+        owned = list(_owned)
+    count = (
+        ScheduleJob.objects.exclude(status__in=ScheduleJob.FINISHED_STATUSES).exclude(id__in=owned)
+        .filter(Q(heartbeat_at__lt=limit) | Q(heartbeat_at__isnull=True, created_at__lt=limit))
+        .update(status='failed', error='Worker stopped before the job finished', finished_at=now)
+    )
+    if count:
+        logger.warning("%d job(s) de planification abandonné(s) marqué(s) en échec", count)
+        bump_versions(ScheduleJob)
+    return count
+
+
+def _ensure_monitor():
+    global _monitor
+    with _running_lock:
+        if _monitor is None:
+            _monitor = threading.Thread(target=_monitor_jobs, name='schedule-job-monitor', daemon=True)
+            _monitor.start()
+
+
+def _monitor_jobs():
+    global _monitor
+    while True:
+        time.sleep(POLL_SECONDS)
+        try:
+            _poll_jobs()
+        except Exception:
+            logger.exception("Échec de la surveillance des jobs de planification")
+        finally:
+            close_old_connections()
+        # Le thread s'arrête quand ce processus n'a plus de job, submit_job le relance
+        with _running_lock:
+            if not _owned:
+                _monitor = None
+                return
+
+
+def _record_progress(job_id, solution):
+    # Appelé par le solveur à chaque solution améliorante : seule la dernière est
+    # conservée, le thread de surveillance l'enregistre au prochain passage
+    with _running_lock:
+        _progress[job_id] = solution
+
+
+def _poll_jobs():
+    """
+    Signe de vie et dernière solution des jobs de ce processus, interruption des
+    jobs dont l'annulation est demandée
+    """
+    with _running_lock:
+        owned = list(_owned)
+        progress = dict(_progress)
+        _progress.clear()
+    if not owned:
+        return
+    ScheduleJob.objects.filter(id__in=owned).exclude(
+        status__in=ScheduleJob.FINISHED_STATUSES
+    ).update(heartbeat_at=timezone.now())
+    for job_id, solution in progress.items():
+        ScheduleJob.objects.filter(id=job_id, status='running').update(progress=solution)
+
+    cancelled = set(ScheduleJob.objects.filter(id__in=owned, cancel_requested=True).values_list('id', flat=True))
+    with _running_lock:
+        schedulers = [_running[job_id] for job_id in cancelled if job_id in _running]
+    for scheduler in schedulers:
+        if not scheduler.stopped:
+            scheduler.stop()
+
+    recover_stale_jobs()
+
+
+def _finish(job, status, result=None, error=''):
+    job.status = status
+    job.result = result
+    job.error = error
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'result', 'error', 'finished_at'])
+
+
+def _run_job(job_id):
+    try:
+        job = ScheduleJob.objects.get(id=job_id)
+        if job.cancel_requested:
+            _finish(job, 'cancelled')
+            return
+
+        job.status = 'running'
+        job.started_at = timezone.now()
+        job.save(update_fields=['status', 'started_at'])
+
+        try:
+            scheduler = build_scheduler(job.options, on_solution=lambda solution: _record_progress(job_id, solution))
+        except MissingDataError:
+            _finish(job, 'failed', error='Missing data for scheduling')
+            return
+
+        with _running_lock:
+            _running[job.id] = scheduler
+        try:
+            result = solve_schedule(scheduler, job.options)
+        finally:
+            with _running_lock:
+                _running.pop(job.id, None)
+
+        job.refresh_from_db(fields=['cancel_requested'])
+        if job.cancel_requested:
+            _finish(job, 'cancelled')
+        elif result['status'] == 'success':
+            try:
+                save_schedule(
+                    result, warm_start=job.options.get('warm_start', False), versions=scheduler.input_versions
+                )
+            except ScheduleConflictError:
+                _finish(
+                    job, 'failed', result=result,
+                    error='Exams, rooms, proctors or time slots changed while solving; submit the job again',
+                )
+                return
+            _finish(job, 'succeeded', result=result)
+        else:
+            _finish(job, 'failed', result=result, error='No feasible schedule found')
+    except Exception as e:
+        logger.exception("Échec du job de planification %s", job_id)
+        ScheduleJob.objects.filter(id=job_id).update(
+            status='failed', error=str(e), finished_at=timezone.now()
+        )
+        bump_versions(ScheduleJob)
+    finally:
+        with _running_lock:
+            _owned.discard(job_id)
+            _progress.pop(job_id, None)
+        close_old_connections()
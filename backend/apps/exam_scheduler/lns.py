@@ -0,0 +1,194 @@
+import logging
+import random
+import time
+
+from .presolve import Presolve
+
+logger = logging.getLogger(__name__)
+
+# Temps de résolution maximal d'un voisinage (en secondes)
+ITERATION_TIME = 5.0
+# Nombre maximal d'examens libérés à chaque itération
+NEIGHBOURHOOD_SIZE = 200
+# Nombre de salles consécutives (par capacité) libérées par le voisinage 'room'
+ROOM_BLOCK = 5
+# Voisinages utilisés à tour de rôle
+NEIGHBOURHOODS = ('day', 'department', 'room')
+
+
+def schedule_objective(scheduler, results):
+    """Objectif commun aux deux moteurs : somme des indices des créneaux de début"""
+    slot_index = {time_slot.start_time: t_idx for t_idx, time_slot in enumerate(scheduler.time_slots)}
+    return sum(slot_index[item['start_time']] for item in results)
+
+
+def pick_neighbourhood(scheduler, assignment, kind, rnd, size=NEIGHBOURHOOD_SIZE):
+    """
+    Choisir les examens à libérer : ceux d'un jour, d'une filière ou d'un bloc
+    de salles de capacités voisines. Retourne un ensemble d'identifiants d'examens.
+    """
+    if kind == 'day':
+        day = rnd.choice(sorted({start_time.date() for _, start_time in assignment.values()}))
+        freed = [exam_id for exam_id, (_, start_time) in assignment.items() if start_time.date() == day]
+    elif kind == 'department':
+        department = rnd.choice(sorted({exam.department for exam in scheduler.exams}))
+        freed = [exam.id for exam in scheduler.exams if exam.department == department]
+    else:
+        room_order = sorted(scheduler.rooms, key=lambda room: room.capacity)
+        first = rnd.randrange(max(1, len(room_order) - ROOM_BLOCK + 1))
+        block = {room.id for room in room_order[first:first + ROOM_BLOCK]}
+        freed = [exam_id for exam_id, (room_id, _) in assignment.items() if room_id in block]
+
+    if len(freed) > size:
+        freed = rnd.sample(freed, size)
+    return set(freed)
+
+
+def greedy_assignment(scheduler, presolve):
+    """
+    Construction gloutonne d'une affectation : les examens les plus longs et
+    les plus gros d'abord, chacun au premier créneau de début possible dans la
+    plus petite salle libre, sans conflit de promotion ni de filière et sans
+    dépasser le nombre d'examens simultanés. Retourne {exam_id: (room_id, start_time)}
+    pour les examens placés.
+    """
+    room_busy = [set() for _ in scheduler.rooms]
+    group_busy = {}
+    slot_load = [0] * len(scheduler.time_slots)
+
+    order = sorted(
+        range(len(scheduler.exams)),
+        key=lambda e_idx: (scheduler.durations[e_idx], scheduler.exams[e_idx].participants or 0),
+        reverse=True,
+    )
+    assignment = {}
+    for e_idx in order:
+        exam = scheduler.exams[e_idx]
+        groups = [group_busy.setdefault(('level', exam.level), set()),
+                  group_busy.setdefault(('department', exam.department), set())]
+        rooms = sorted(presolve.candidate_rooms[e_idx], key=lambda r_idx: scheduler.rooms[r_idx].capacity)
+        spans = scheduler.spans[scheduler.span_rows[e_idx]]
+        for t_idx in presolve.candidate_starts[e_idx]:
+            slots = range(t_idx, t_idx + int(spans[t_idx]))
+            if any(t in busy for busy in groups for t in slots):
+                continue
+            if any(slot_load[t] >= scheduler.proctor_capacity for t in slots):
+                continue
+            r_idx = next((r_idx for r_idx in rooms if not any(t in room_busy[r_idx] for t in slots)), None)
+            if r_idx is None:
+                continue
+            for busy in groups + [room_busy[r_idx]]:
+                busy.update(slots)
+            for t in slots:
+                slot_load[t] += 1
+            assignment[exam.id] = (scheduler.rooms[r_idx].id, scheduler.time_slots[t_idx].start_time)
+            break
+    return assignment
+
+
+def _solve_neighbourhood(scheduler, hints, fixed, time_limit, first_solution=False):
+    from .optimizer import ExamScheduler
+
+    neighbourhood = ExamScheduler.from_instance(
+        scheduler.instance, engine=scheduler.engine, proctor_capacity=scheduler.proctor_capacity,
+        hints=hints, fixed=fixed, conflict_encoding=scheduler.conflict_encoding,
+        solver_params=dict(scheduler.solver_params, time_limit=time_limit),
+    )
+    if first_solution:
+        neighbourhood.solver.parameters.stop_after_first_solution = True
+
+    # Permettre à scheduler.stop() d'interrompre la résolution en cours
+    scheduler.neighbourhood = neighbourhood
+    if scheduler.stopped:
+        neighbourhood.stop()
+    try:
+        return neighbourhood.create_timetable()
+    finally:
+        scheduler.neighbourhood = None
+
+
+def solve_lns(scheduler, time_budget, iteration_time=ITERATION_TIME, size=NEIGHBOURHOOD_SIZE, seed=0):
+    """
+    Recherche à grand voisinage : partir d'une solution réalisable puis, à
+    chaque itération, fixer toutes les affectations sauf celles d'un voisinage
+    (un jour, une filière ou un bloc de salles) et ré-optimiser ce voisinage
+    avec une limite de temps courte, jusqu'à épuisement du budget total.
+    """
+    started = time.monotonic()
+    rnd = random.Random(seed)
+
+    def remaining():
+        return time_budget - (time.monotonic() - started)
+
+    # Solution initiale : construction gloutonne, complétée par le solveur si elle
+    # ne place pas tous les examens. Avec un démarrage à chaud, l'affectation
+    # actuelle l'emporte sur la construction gloutonne comme indication du solveur.
+    # Les itérations ne minimisent que la somme des créneaux : minimal_change
+    # n'est pas pris en compte (refusé par services.parse_options).
+    hints = {
+        scheduler.exams[e_idx].id: (scheduler.rooms[r_idx].id, scheduler.time_slots[t_idx].start_time)
+        for e_idx, (r_idx, t_idx) in scheduler.hints.items()
+    }
+    presolve = Presolve(scheduler.instance, scheduler.spans, scheduler.span_rows)
+    if not presolve.is_feasible():
+        return {'status': 'no_solution', 'results': [], 'presolve': presolve.stats}
+    # Borne inférieure : chaque examen à son premier créneau de début possible
+    lower_bound = sum(starts[0] for starts in presolve.candidate_starts)
+
+    greedy = greedy_assignment(scheduler, presolve)
+    if len(greedy) == len(scheduler.exams) and not hints:
+        result = _solve_neighbourhood(scheduler, greedy, greedy, max(remaining(), 0))
+    else:
+        result = _solve_neighbourhood(
+            scheduler, {**greedy, **hints}, {}, max(remaining(), 0), first_solution=True
+        )
+    if result['status'] != 'success':
+        return result
+
+    best = result['results']
+    objective = schedule_objective(scheduler, best)
+    iterations = []
+    logger.info("LNS : solution initiale d'objectif %d en %.1f s", objective, time.monotonic() - started)
+
+    while remaining() > 0 and not scheduler.stopped and objective > lower_bound:
+        kind = NEIGHBOURHOODS[len(iterations) % len(NEIGHBOURHOODS)]
+        assignment = {item['exam_id']: (item['room_id'], item['start_time']) for item in best}
+        freed = pick_neighbourhood(scheduler, assignment, kind, rnd, size)
+        fixed = {exam_id: value for exam_id, value in assignment.items() if exam_id not in freed}
+
+        partial = _solve_neighbourhood(scheduler, assignment, fixed, min(iteration_time, remaining()))
+        improved = False
+        if partial['status'] == 'success':
+            candidate = schedule_objective(scheduler, partial['results'])
+            if candidate <= objective:
+                improved = candidate < objective
+                best, objective = partial['results'], candidate
+
+        iterations.append({
+            'iteration': len(iterations) + 1,
+            'neighbourhood': kind,
+            'freed': len(freed),
+            'status': partial['status'],
+            'objective': objective,
+            'improved': improved,
+            'elapsed': round(time.monotonic() - started, 3),
+        })
+        logger.info("LNS : %s", iterations[-1])
+        if improved and scheduler.on_solution is not None:
+            scheduler.on_solution({
+                'objective': objective,
+                'wall_time': time.monotonic() - started,
+                'iteration': len(iterations),
+                'results': best,
+            })
+
+    return {
+        'status': 'success',
+        'results': best,
+        'presolve': result['presolve'],
+        'lns': {
+            'initial_objective': schedule_objective(scheduler, result['results']),
+            'objective': objective,
+            'iterations': iterations,
+        },
+    }
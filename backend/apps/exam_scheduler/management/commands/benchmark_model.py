@@ -0,0 +1,57 @@
+import time
+
+from django.core.management.base import BaseCommand
+from ortools.sat.python import cp_model
+
+from ...optimizer import ExamScheduler
+from ...presolve import Presolve
+from ...synthetic import generate_instance
+
+
+class Command(BaseCommand):
+    help = "Compare la taille et le temps de construction du modèle booléen selon l'encodage des conflits"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--exams', type=int, default=100)
+        parser.add_argument('--rooms', type=int, default=15)
+        parser.add_argument('--days', type=int, default=None)
+        parser.add_argument('--levels', type=int, default=10)
+        parser.add_argument('--departments', type=int, default=12)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--solve-time', type=float, default=0,
+                            help="Temps de résolution par encodage en secondes (0 : pas de résolution)")
+        parser.add_argument('--encodings', nargs='+', default=list(ExamScheduler.CONFLICT_ENCODINGS),
+                            choices=ExamScheduler.CONFLICT_ENCODINGS)
+
+    def handle(self, *args, **options):
+        instance = generate_instance(
+            options['exams'], rooms=options['rooms'], days=options['days'],
+            levels=options['levels'], departments=options['departments'], seed=options['seed'],
+        )
+        self.stdout.write(
+            f"{len(instance.exams)} examens, {len(instance.rooms)} salles, {len(instance.time_slots)} créneaux, "
+            f"{options['levels']} promotions, {options['departments']} filières"
+        )
+
+        for encoding in options['encodings']:
+            scheduler = ExamScheduler.from_instance(
+                instance, proctor_capacity=len(instance.exams), conflict_encoding=encoding,
+                solver_params={'time_limit': options['solve_time']},
+            )
+            started = time.perf_counter()
+            scheduler.presolve = Presolve(scheduler.instance, scheduler.spans, scheduler.span_rows)
+            scheduler._build_boolean_model()
+            build_time = time.perf_counter() - started
+
+            proto = scheduler.model.Proto()
+            line = (
+                f"{encoding:>9} : {len(proto.variables)} variables, {len(proto.constraints)} contraintes, "
+                f"construction {build_time:.2f} s"
+            )
+            if options['solve_time'] > 0:
+                status = scheduler._solve()
+                line += f", résolution {scheduler.solver.WallTime():.2f} s ({scheduler.solver.StatusName(status)}"
+                if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+                    line += f", objectif {scheduler.solver.ObjectiveValue():.0f}"
+                line += ")"
+            self.stdout.write(line)
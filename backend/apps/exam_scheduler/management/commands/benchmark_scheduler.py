@@ -0,0 +1,142 @@
+import json
+import platform
+import time
+
+import ortools
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from ortools.sat.python import cp_model
+
+from ...optimizer import ExamScheduler
+from ...presolve import Presolve
+from ...synthetic import generate_instance
+
+SIZES = (10, 50, 100, 500, 1000, 5000)
+# Au-delà, le modèle booléen (une variable par examen, salle et début) n'est pas construit
+MAX_BOOLEAN_VARIABLES = 5_000_000
+
+
+def run_engine(instance, engine, time_limit, num_workers=None, max_boolean_variables=MAX_BOOLEAN_VARIABLES):
+    """
+    Résoudre une instance avec un moteur en chronométrant chaque étape :
+    pré-traitement, construction du modèle, résolution, extraction des
+    résultats et affectation des surveillants. Retourne un dictionnaire
+    sérialisable en JSON.
+    """
+    solver_params = {'time_limit': time_limit}
+    if num_workers is not None:
+        solver_params['num_workers'] = num_workers
+    scheduler = ExamScheduler.from_instance(instance, engine=engine, solver_params=solver_params)
+    record = {
+        'engine': engine,
+        'exams': len(instance.exams),
+        'rooms': len(instance.rooms),
+        'proctors': len(instance.proctors),
+        'time_slots': len(instance.time_slots),
+        'status': None,
+        'timings': {},
+    }
+    timings = record['timings']
+
+    started = time.perf_counter()
+    scheduler.presolve = Presolve(instance, scheduler.spans, scheduler.span_rows)
+    timings['presolve'] = time.perf_counter() - started
+    if not scheduler.presolve.is_feasible():
+        record['status'] = 'infeasible_presolve'
+        return record
+
+    if engine == 'boolean':
+        variables = sum(
+            len(rooms) * len(starts)
+            for rooms, starts in zip(scheduler.presolve.candidate_rooms, scheduler.presolve.candidate_starts)
+        )
+        if variables > max_boolean_variables:
+            record['status'] = 'skipped'
+            record['variables'] = variables
+            return record
+
+    started = time.perf_counter()
+    if engine == 'interval':
+        scheduler._build_interval_model()
+    else:
+        scheduler._build_boolean_model()
+    timings['build'] = time.perf_counter() - started
+    proto = scheduler.model.Proto()
+    record['variables'] = len(proto.variables)
+    record['constraints'] = len(proto.constraints)
+
+    started = time.perf_counter()
+    status = scheduler._solve()
+    timings['solve'] = time.perf_counter() - started
+    record['status'] = scheduler.solver.StatusName(status)
+    if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        return record
+    record['objective'] = scheduler.solver.ObjectiveValue()
+    record['best_bound'] = scheduler.solver.BestObjectiveBound()
+
+    started = time.perf_counter()
+    result = {'status': 'success', 'results': scheduler.extract_results(scheduler.solver.ResponseProto().solution)}
+    timings['extract'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    scheduler._assign_proctors(result)
+    timings['proctors'] = time.perf_counter() - started
+    record['scheduled_exams'] = len(result['results'])
+    record['understaffed_exams'] = len(result.get('understaffed_exam_ids', []))
+    return record
+
+
+class Command(BaseCommand):
+    help = ("Mesure le temps de pré-traitement, de construction, de résolution et d'extraction "
+            "de chaque moteur sur des sessions synthétiques de taille croissante (résultats en JSON)")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', type=int, default=list(SIZES),
+                            help="Nombres d'examens à tester")
+        parser.add_argument('--engines', nargs='+', default=list(ExamScheduler.ENGINES),
+                            choices=ExamScheduler.ENGINES)
+        parser.add_argument('--time-limit', type=float, default=10.0,
+                            help="Temps de résolution maximal par moteur et par taille, en secondes")
+        parser.add_argument('--num-workers', type=int, default=None)
+        parser.add_argument('--levels', type=int, default=None,
+                            help="Nombre de promotions (par défaut proportionnel au nombre d'examens)")
+        parser.add_argument('--departments', type=int, default=None,
+                            help="Nombre de filières (par défaut proportionnel au nombre d'examens)")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--max-boolean-variables', type=int, default=MAX_BOOLEAN_VARIABLES)
+        parser.add_argument('--output', default=None,
+                            help="Fichier JSON des résultats (sortie standard par défaut)")
+
+    def handle(self, *args, **options):
+        runs = []
+        for size in options['sizes']:
+            instance = generate_instance(
+                size, levels=options['levels'], departments=options['departments'], seed=options['seed'],
+            )
+            for engine in options['engines']:
+                record = run_engine(
+                    instance, engine, options['time_limit'], options['num_workers'],
+                    options['max_boolean_variables'],
+                )
+                runs.append(record)
+                self.stderr.write(
+                    f"{size:>6} examens  {engine:>8} : {record['status']}  "
+                    + '  '.join(f"{phase} {seconds:.2f} s" for phase, seconds in record['timings'].items())
+                )
+
+        report = {
+            'created_at': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'ortools': ortools.__version__,
+            'parameters': {
+                name: options[name]
+                for name in ('sizes', 'engines', 'time_limit', 'num_workers', 'levels', 'departments', 'seed')
+            },
+            'runs': runs,
+        }
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(report, output, indent=2)
+        else:
+            self.stdout.write(json.dumps(report, indent=2))
+
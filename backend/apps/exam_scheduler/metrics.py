@@ -0,0 +1,159 @@
+import threading
+import time
+
+from django.db import connection
+from django.http import HttpResponse
+
+# Bornes des histogrammes : secondes, nombre de requêtes SQL, octets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+SOLVE_BUCKETS = (0.1, 0.5, 1, 5, 10, 30, 60, 120, 300, 600)
+
+_lock = threading.Lock()
+_registry = []
+
+
+def _format(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+class Counter:
+    """Compteur par combinaison d'étiquettes, conservé en mémoire du processus"""
+    kind = 'counter'
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.values = {}
+        _registry.append(self)
+
+    def _key(self, labels):
+        return tuple(str(labels[label]) for label in self.labels)
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with _lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def samples(self):
+        for key, value in sorted(self.values.items()):
+            yield self.name, dict(zip(self.labels, key)), value
+
+
+class Histogram(Counter):
+    """Histogramme cumulatif (buckets, somme, nombre d'observations) par combinaison d'étiquettes"""
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = buckets
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with _lock:
+            counts, total, observations = self.values.get(key, ([0] * len(self.buckets), 0, 0))
+            for position, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[position] += 1
+            self.values[key] = (counts, total + value, observations + 1)
+
+    def samples(self):
+        for key, (counts, total, observations) in sorted(self.values.items()):
+            labels = dict(zip(self.labels, key))
+            for bound, count in zip(self.buckets, counts):
+                yield f'{self.name}_bucket', dict(labels, le=_format(bound)), count
+            yield f'{self.name}_bucket', dict(labels, le='+Inf'), observations
+            yield f'{self.name}_sum', labels, total
+            yield f'{self.name}_count', labels, observations
+
+
+# API
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', "Durée de traitement des requêtes HTTP", ('route', 'method'),
+)
+REQUESTS = Counter('http_requests_total', "Requêtes HTTP traitées", ('route', 'method', 'status'))
+REQUEST_QUERIES = Histogram(
+    'http_request_db_queries', "Requêtes SQL exécutées par requête HTTP", ('route', 'method'), QUERY_BUCKETS,
+)
+RESPONSE_SIZE = Histogram(
+    'http_response_size_bytes', "Taille des réponses HTTP (hors streaming)", ('route', 'method'), SIZE_BUCKETS,
+)
+
+# Solveur
+SOLVES = Counter('scheduler_solves_total', "Planifications par moteur et résultat", ('engine', 'status'))
+SOLVE_DURATION = Histogram(
+    'scheduler_solve_duration_seconds', "Durée totale des planifications", ('engine',), SOLVE_BUCKETS,
+)
+INFEASIBLE = Counter('scheduler_infeasible_total', "Planifications sans solution", ('engine',))
+CACHE_LOOKUPS = Counter(
+    'scheduler_solution_cache_total', "Consultations du cache des emplois du temps", ('result',),
+)
+
+
+def record_solve(report):
+    """Mettre à jour les compteurs du solveur à partir d'un rapport de résolution"""
+    engine = report['engine']
+    SOLVES.inc(engine=engine, status=report['status'])
+    SOLVE_DURATION.observe(report['wall_time'], engine=engine)
+    if report['status'] != 'success':
+        INFEASIBLE.inc(engine=engine)
+    if 'cache' in report['phases']:
+        CACHE_LOOKUPS.inc(result='hit' if report.get('cached') else 'miss')
+
+
+def render():
+    """Toutes les métriques au format texte de Prometheus"""
+    lines = []
+    with _lock:
+        for metric in _registry:
+            lines.append(f'# HELP {metric.name} {metric.help_text}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            for name, labels, value in metric.samples():
+                label_text = ','.join(f'{label}="{_escape(text)}"' for label, text in labels.items())
+                lines.append(f'{name}{{{label_text}}} {_format(value)}' if label_text else f'{name} {_format(value)}')
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view(request):
+    """Point d'accès /metrics lu par Prometheus"""
+    return HttpResponse(render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+class MetricsMiddleware:
+    """
+    Mesurer chaque requête : durée, nombre de requêtes SQL et taille de la
+    réponse, par route (le motif d'URL, pas le chemin, pour borner le
+    nombre de séries).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = [0]
+
+        def count_query(execute, sql, params, many, context):
+            queries[0] += 1
+            return execute(sql, params, many, context)
+
+        started = time.perf_counter()
+        with connection.execute_wrapper(count_query):
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+
+        match = getattr(request, 'resolver_match', None)
+        route = match.route if match is not None else 'unmatched'
+        REQUEST_LATENCY.observe(elapsed, route=route, method=request.method)
+        REQUESTS.inc(route=route, method=request.method, status=response.status_code)
+        REQUEST_QUERIES.observe(queries[0], route=route, method=request.method)
+        if not response.streaming:
+            RESPONSE_SIZE.observe(len(response.content), route=route, method=request.method)
+        return response
@@ -0,0 +1,51 @@
+# Generated by Django 5.1.7 on 2026-10-17 11:54
+
+import django.db.models.constraints
+from django.db import migrations, models
+
+
+def remove_duplicate_timeslots(apps, schema_editor):
+    """
+    Garder un seul créneau par (salle, début, fin), de préférence celui qui
+    porte un examen ; les autres sont supprimés avant d'ajouter la contrainte.
+    Si plusieurs doublons portent des examens différents, la migration échoue
+    en listant les créneaux en conflit plutôt que de perdre un placement.
+    """
+    TimeSlot = apps.get_model('exam_scheduler', 'TimeSlot')
+    kept = {}
+    duplicates = []
+    conflicts = []
+    # Les créneaux avec examen d'abord, puis par ancienneté
+    for slot_id, room_id, start_time, end_time, exam_id in TimeSlot.objects.order_by(
+        models.F('exam_id').asc(nulls_last=True), 'id'
+    ).values_list('id', 'room_id', 'start_time', 'end_time', 'exam_id').iterator():
+        key = (room_id, start_time, end_time)
+        if key not in kept:
+            kept[key] = (slot_id, exam_id)
+            continue
+        if exam_id is not None and exam_id != kept[key][1]:
+            conflicts.append((kept[key][0], slot_id))
+        duplicates.append(slot_id)
+    if conflicts:
+        raise ValueError(
+            'Time slots with the same room and period hold different exams, '
+            'reschedule them before migrating (kept slot id, duplicate slot id): '
+            + ', '.join(f'({kept_id}, {slot_id})' for kept_id, slot_id in conflicts)
+        )
+    for position in range(0, len(duplicates), 1000):
+        TimeSlot.objects.filter(id__in=duplicates[position:position + 1000]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exam_scheduler', '0002_schedulejob'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_timeslots, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='timeslot',
+            constraint=models.UniqueConstraint(deferrable=django.db.models.constraints.Deferrable['DEFERRED'], fields=('room', 'start_time', 'end_time'), name='unique_timeslot_room_period', nulls_distinct=False),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.1.7 on 2026-10-17 11:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exam_scheduler', '0004_modelversion'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='exam',
+            index=models.Index(fields=['level', 'department', 'date'], name='exam_level_department_date'),
+        ),
+        migrations.AddIndex(
+            model_name='exam',
+            index=models.Index(fields=['department', 'date'], name='exam_department_date'),
+        ),
+        migrations.AddIndex(
+            model_name='exam',
+            index=models.Index(fields=['date'], name='exam_date'),
+        ),
+        migrations.AddIndex(
+            model_name='exam',
+            index=models.Index(condition=models.Q(('room__isnull', True)), fields=['id'], name='exam_unscheduled'),
+        ),
+        migrations.AddIndex(
+            model_name='timeslot',
+            index=models.Index(fields=['start_time'], name='timeslot_start_time'),
+        ),
+        migrations.AddIndex(
+            model_name='timeslot',
+            index=models.Index(condition=models.Q(('exam__isnull', True)), fields=['start_time'], name='timeslot_free_start_time'),
+        ),
+    ]
@@ -0,0 +1,92 @@
+# Generated by Django 5.1.7 on 2026-10-17 12:10
+
+import re
+
+import django.core.validators
+from django.db import migrations, models
+
+# Copie figée de durations.py au moment de la migration : le module de
+# l'application peut évoluer sans changer le résultat de cette migration
+DURATION_PATTERN = re.compile(r'^\s*(?:(\d+)\s*[hH]\s*(\d{1,2})?|(\d+))\s*$')
+
+
+def parse_duration(value):
+    """Convertir une durée ("2h30", "1h", "90") en minutes, ValueError si elle est invalide ou nulle"""
+    if isinstance(value, int) and not isinstance(value, bool):
+        minutes = value
+    else:
+        match = DURATION_PATTERN.match(str(value))
+        if not match:
+            raise ValueError(f"Invalid duration: {value!r}")
+        hours, extra, only_minutes = match.groups()
+        if only_minutes is not None:
+            minutes = int(only_minutes)
+        else:
+            if extra is not None and int(extra) >= 60:
+                raise ValueError(f"Invalid duration: {value!r}")
+            minutes = int(hours) * 60 + int(extra or 0)
+    if minutes <= 0:
+        raise ValueError(f"Duration must be positive: {value!r}")
+    return minutes
+
+
+def format_duration(minutes):
+    """Écrire une durée en minutes au format "2h30" """
+    if minutes is None:
+        return None
+    return f"{minutes // 60}h{minutes % 60:02d}"
+
+
+def durations_to_minutes(apps, schema_editor):
+    """Convertir les durées texte ("2h30", "1h", "90") en minutes"""
+    Exam = apps.get_model('exam_scheduler', 'Exam')
+    exams = list(Exam.objects.only('id', 'duration'))
+    invalid = []
+    for exam in exams:
+        try:
+            exam.duration_minutes = parse_duration(exam.duration)
+        except ValueError:
+            invalid.append(f"{exam.id}: {exam.duration!r}")
+    if invalid:
+        raise ValueError("Durées d'examens invalides, à corriger avant la migration : " + ', '.join(invalid))
+    Exam.objects.bulk_update(exams, ['duration_minutes'], batch_size=1000)
+
+
+def minutes_to_durations(apps, schema_editor):
+    Exam = apps.get_model('exam_scheduler', 'Exam')
+    exams = list(Exam.objects.only('id', 'duration_minutes'))
+    for exam in exams:
+        exam.duration = format_duration(exam.duration_minutes)
+    Exam.objects.bulk_update(exams, ['duration'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exam_scheduler', '0005_scheduler_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exam',
+            name='duration_minutes',
+            field=models.PositiveIntegerField(null=True),
+        ),
+        # Ancienne colonne facultative le temps de la conversion, pour que la
+        # migration inverse puisse la recréer avant de la remplir
+        migrations.AlterField(
+            model_name='exam',
+            name='duration',
+            field=models.CharField(max_length=50, null=True),
+        ),
+        migrations.RunPython(durations_to_minutes, minutes_to_durations),
+        migrations.RemoveField(
+            model_name='exam',
+            name='duration',
+        ),
+        migrations.AlterField(
+            model_name='exam',
+            name='duration_minutes',
+            field=models.PositiveIntegerField(validators=[django.core.validators.MinValueValidator(1)]),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.1.7 on 2026-10-17 12:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exam_scheduler', '0007_cachedsolution'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SolveHistory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('engine', models.CharField(max_length=20)),
+                ('status', models.CharField(max_length=20)),
+                ('cached', models.BooleanField(default=False)),
+                ('exams', models.PositiveIntegerField()),
+                ('rooms', models.PositiveIntegerField()),
+                ('time_slots', models.PositiveIntegerField()),
+                ('variables', models.PositiveIntegerField(blank=True, null=True)),
+                ('constraints', models.PositiveIntegerField(blank=True, null=True)),
+                ('solver_status', models.CharField(blank=True, max_length=20)),
+                ('objective', models.FloatField(blank=True, null=True)),
+                ('best_bound', models.FloatField(blank=True, null=True)),
+                ('gap', models.FloatField(blank=True, null=True)),
+                ('branches', models.BigIntegerField(blank=True, null=True)),
+                ('conflicts', models.BigIntegerField(blank=True, null=True)),
+                ('wall_time', models.FloatField()),
+                ('phases', models.JSONField(default=dict)),
+                ('options', models.JSONField(blank=True, default=dict)),
+            ],
+            options={
+                'verbose_name_plural': 'solve history',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -1,5 +1,11 @@
+import uuid
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.validators import MinValueValidator
 from django.db import models
 
+from .durations import format_duration, parse_duration
+
 class Room(models.Model):
     ROOM_STATUS_CHOICES = [
         ('available', 'Disponible'),
@@ -70,10 +76,30 @@ class Exam(models.Model):
         max_length=20,
         choices=DEPARTMENT_CHOICES,
     )
-    duration = models.CharField(max_length=50)
+    # Durée en minutes ; `duration` la lit et l'écrit au format "2h30"
+    duration_minutes = models.PositiveIntegerField(validators=[MinValueValidator(1)])
     room = models.ForeignKey(Room, on_delete=models.SET_NULL, null=True, blank=True)
     participants = models.IntegerField(null=True, blank=True)
     proctors = models.ManyToManyField(Proctor, blank=True)
+
+    class Meta:
+        indexes = [
+            # Filtres de la liste des examens : promotion, filière et jour
+            # (le jour est filtré par intervalle sur `date`)
+            models.Index(fields=['level', 'department', 'date'], name='exam_level_department_date'),
+            models.Index(fields=['department', 'date'], name='exam_department_date'),
+            models.Index(fields=['date'], name='exam_date'),
+            # Examens non planifiés, chargés par le solveur
+            models.Index(fields=['id'], condition=models.Q(room__isnull=True), name='exam_unscheduled'),
+        ]
+
+    @property
+    def duration(self):
+        return format_duration(self.duration_minutes)
+
+    @duration.setter
+    def duration(self, value):
+        self.duration_minutes = parse_duration(value)
     
     def __str__(self):
         return f"{self.name} - {self.get_level_display()} {self.get_department_display()}"
@@ -84,8 +110,118 @@ class TimeSlot(models.Model):
     start_time = models.DateTimeField()
     end_time = models.DateTimeField()
     exam = models.ForeignKey(Exam, on_delete=models.SET_NULL, null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            # Un seul créneau par salle et par période (les créneaux sans salle
+            # comptent comme une même salle). Vérifiée en fin de transaction pour
+            # que l'enregistrement d'un emploi du temps puisse échanger des créneaux.
+            models.UniqueConstraint(
+                fields=['room', 'start_time', 'end_time'],
+                name='unique_timeslot_room_period',
+                nulls_distinct=False,
+                deferrable=models.Deferrable.DEFERRED,
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['start_time'], name='timeslot_start_time'),
+            # Créneaux libres, chargés par le solveur dans l'ordre chronologique
+            models.Index(fields=['start_time'], condition=models.Q(exam__isnull=True), name='timeslot_free_start_time'),
+        ]
     
     def __str__(self):
         room_name = self.room.name if self.room else "Aucune salle"
         exam_name = self.exam.name if self.exam else "Aucun examen"
-        return f"{room_name} - {self.start_time.strftime('%d/%m/%Y %H:%M')} - {exam_name}"
\ No newline at end of file
+        return f"{room_name} - {self.start_time.strftime('%d/%m/%Y %H:%M')} - {exam_name}"
+
+class ScheduleJob(models.Model):
+    STATUS_CHOICES = [
+        ('pending', 'En attente'),
+        ('running', 'En cours'),
+        ('succeeded', 'Terminé'),
+        ('failed', 'Échoué'),
+        ('cancelled', 'Annulé'),
+    ]
+    FINISHED_STATUSES = ('succeeded', 'failed', 'cancelled')
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    options = models.JSONField(default=dict, blank=True)
+    result = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    error = models.TextField(blank=True)
+    cancel_requested = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # Signe de vie du processus qui exécute le job (voir jobs.recover_stale_jobs)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    # Dernière solution améliorante trouvée pendant la résolution (voir jobs.follow_job)
+    progress = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    @property
+    def is_finished(self):
+        return self.status in self.FINISHED_STATUSES
+
+    def __str__(self):
+        return f"Job {self.id} ({self.get_status_display()})"
+
+
+class ModelVersion(models.Model):
+    """
+    Compteur de modifications d'une table (ex: 'exam_scheduler.exam'), incrémenté
+    à chaque écriture. Sert à calculer les ETag / Last-Modified des réponses.
+    """
+    label = models.CharField(max_length=100, unique=True)
+    version = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.label} v{self.version}"
+
+
+class CachedSolution(models.Model):
+    """
+    Emploi du temps calculé pour une entrée donnée, identifiée par l'empreinte
+    des examens, salles, surveillants, créneaux et options de résolution.
+    """
+    key = models.CharField(max_length=64, unique=True)
+    result = models.JSONField(encoder=DjangoJSONEncoder)
+    hits = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"{self.key[:12]} ({self.hits} hits)"
+
+
+class SolveHistory(models.Model):
+    """Rapport d'une résolution (durées par étape, taille du modèle, solveur), pour suivre les tendances"""
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    engine = models.CharField(max_length=20)
+    status = models.CharField(max_length=20)
+    cached = models.BooleanField(default=False)
+    exams = models.PositiveIntegerField()
+    rooms = models.PositiveIntegerField()
+    time_slots = models.PositiveIntegerField()
+    variables = models.PositiveIntegerField(null=True, blank=True)
+    constraints = models.PositiveIntegerField(null=True, blank=True)
+    solver_status = models.CharField(max_length=20, blank=True)
+    objective = models.FloatField(null=True, blank=True)
+    best_bound = models.FloatField(null=True, blank=True)
+    gap = models.FloatField(null=True, blank=True)
+    branches = models.BigIntegerField(null=True, blank=True)
+    conflicts = models.BigIntegerField(null=True, blank=True)
+    # Durée totale et durée de chaque étape (en secondes)
+    wall_time = models.FloatField()
+    phases = models.JSONField(default=dict)
+    options = models.JSONField(default=dict, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name_plural = 'solve history'
+
+    def __str__(self):
+        return f"{self.created_at:%d/%m/%Y %H:%M} {self.engine} {self.status} ({self.wall_time:.1f} s)"
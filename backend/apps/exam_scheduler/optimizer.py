@@ -1,132 +1,565 @@
-from ortools.sat.python import cp_model
+import logging
+import time
+from contextlib import contextmanager
 from datetime import timedelta
 
+import numpy as np
+from ortools.sat.python import cp_model
+
+from .decomposition import solve_decomposed
+from .instance import ProblemInstance
+from .lns import solve_lns
+from .presolve import Presolve
+from .proctoring import assign_proctors
+
+logger = logging.getLogger(__name__)
+
+
+def _group(keys, values):
+    """Regrouper values par clé : (clés distinctes triées, liste des valeurs de chaque clé)"""
+    order = np.argsort(keys, kind='stable')
+    keys = keys[order]
+    bounds = np.flatnonzero(keys[1:] != keys[:-1]) + 1
+    starts = np.concatenate(([0], bounds)) if len(keys) else bounds
+    values = values[order].tolist()
+    ends = np.append(bounds, len(keys)).tolist()
+    return keys[starts], [values[begin:end] for begin, end in zip(starts.tolist(), ends)]
+
+
+# Les variables et contraintes du modèle booléen sont écrites directement dans le
+# CpModelProto à partir d'indices de variables : l'API Python crée un objet (et fait
+# des vérifications) par variable et par littéral.
+
+def _add_bool_var(proto, name):
+    proto.variables.add(domain=(0, 1), name=name)
+    return len(proto.variables) - 1
+
+
+def _add_exactly_one(proto, literals):
+    proto.constraints.add().exactly_one.literals.extend(literals)
+
+
+def _add_at_most_one(proto, literals):
+    proto.constraints.add().at_most_one.literals.extend(literals)
+
+
+def _add_linear(proto, variables, coefficients, lower, upper):
+    """lower <= somme des coefficients * variables <= upper"""
+    linear = proto.constraints.add().linear
+    linear.vars.extend(variables)
+    linear.coeffs.extend(coefficients)
+    linear.domain.extend((lower, upper))
+
+
+class SolutionStreamCallback(cp_model.CpSolverSolutionCallback):
+    """Transmettre chaque solution améliorante trouvée pendant la recherche"""
+
+    def __init__(self, scheduler, on_solution):
+        super().__init__()
+        self.scheduler = scheduler
+        self.on_solution = on_solution
+
+    def on_solution_callback(self):
+        self.on_solution({
+            'objective': self.ObjectiveValue(),
+            'wall_time': self.WallTime(),
+            'results': self.scheduler.extract_results(self.Response().solution),
+        })
+
+
 class ExamScheduler:
-    def __init__(self, exams, rooms, proctors, time_slots):
-        self.exams = exams
-        self.rooms = rooms
-        self.proctors = proctors
-        self.time_slots = time_slots
+    # Moteurs disponibles :
+    # - 'boolean'  : une variable booléenne par (examen, salle, créneau)
+    # - 'interval' : une variable de début et des intervalles optionnels par (examen, salle)
+    ENGINES = ('boolean', 'interval')
+    # Encodage des conflits de promotion/filière du moteur 'boolean' :
+    # - 'clique'   : un AtMostOne par groupe et par créneau
+    # - 'pairwise' : une contrainte par paire d'examens et par créneau (ancien encodage)
+    CONFLICT_ENCODINGS = ('clique', 'pairwise')
+
+    def __init__(self, exams, rooms, proctors, time_slots, engine='boolean',
+                 decompose=False, max_workers=None, proctor_capacity=None,
+                 hints=None, minimal_change=False, solver_params=None, on_solution=None,
+                 conflict_encoding='clique', fixed=None, lns_budget=None, instance=None):
+        if engine not in self.ENGINES:
+            raise ValueError(f"Moteur inconnu : {engine}")
+        if conflict_encoding not in self.CONFLICT_ENCODINGS:
+            raise ValueError(f"Encodage des conflits inconnu : {conflict_encoding}")
+
+        # Instantané compact du problème : lignes légères et tableaux NumPy.
+        # Les créneaux y sont indexés dans l'ordre chronologique, un seul créneau par heure de début
+        self.instance = instance if instance is not None else ProblemInstance(exams, rooms, proctors, time_slots)
+        self.exams = self.instance.exams
+        self.rooms = self.instance.rooms
+        self.proctors = self.instance.proctors
+        self.time_slots = self.instance.time_slots
+        # Nombre maximal d'examens simultanés (un surveillant par examen)
+        self.proctor_capacity = len(self.proctors) if proctor_capacity is None else proctor_capacity
+        self.engine = engine
+        self.conflict_encoding = conflict_encoding
+        # Résolution parallèle des composantes indépendantes du graphe des conflits
+        self.decompose = decompose
+        self.max_workers = max_workers
         self.model = cp_model.CpModel()
         self.solver = cp_model.CpSolver()
+        # Paramètres du solveur : time_limit (s), num_workers, relative_gap, random_seed
+        self.solver_params = solver_params or {}
+        self._configure_solver()
+        # Fonction appelée avec chaque solution améliorante (résultats partiels)
+        self.on_solution = on_solution
+
+        # Durées en minutes (validées à l'écriture) et nombre de créneaux occupés selon
+        # le créneau de début : spans[span_rows[e], t] (voir ProblemInstance.slot_spans)
+        self.durations = self.instance.durations.tolist()
+        self.spans, self.span_rows = self.instance.slot_spans()
+        self.presolve = None
+
+        # Démarrage à chaud : hints[e] = (indice de salle, indice de créneau) de
+        # l'affectation actuelle, à partir de {exam_id: (room_id, start_time)}
+        self.hints = self._resolve_hints(hints or {})
+        # Pénaliser chaque examen déplacé par rapport à son affectation actuelle
+        self.minimal_change = minimal_change
+        # Affectations imposées, même format que hints (utilisé par la recherche à grand voisinage)
+        self.fixed = self._resolve_hints(fixed or {})
+        # Budget total (en secondes) de la recherche à grand voisinage ; None pour une résolution complète
+        self.lns_budget = lns_budget
+        self.neighbourhood = None  # planificateur du voisinage en cours de résolution
+        self.stopped = False
+
+        # Rapport de résolution : durée de chaque étape, taille du modèle, statistiques du solveur
+        self.report = {
+            'engine': engine,
+            'conflict_encoding': conflict_encoding,
+            'exams': len(self.exams),
+            'rooms': len(self.rooms),
+            'proctors': len(self.proctors),
+            'time_slots': len(self.time_slots),
+            'phases': {},
+            'variables': None,
+            'constraints': None,
+            'solver': None,
+        }
+
+    @classmethod
+    def from_instance(cls, instance, **options):
+        """Construire le planificateur à partir d'un instantané ProblemInstance"""
+        return cls(instance.exams, instance.rooms, instance.proctors, instance.time_slots, instance=instance, **options)
+
+    def stop(self):
+        """Interrompre la résolution en cours (appelé depuis un autre thread)"""
+        self.stopped = True
+        self.solver.StopSearch()
+        neighbourhood = self.neighbourhood
+        if neighbourhood is not None:
+            neighbourhood.stop()
+
+    def _configure_solver(self):
+        parameters = self.solver.parameters
+        if self.solver_params.get('time_limit') is not None:
+            parameters.max_time_in_seconds = float(self.solver_params['time_limit'])
+        if self.solver_params.get('num_workers') is not None:
+            parameters.num_workers = int(self.solver_params['num_workers'])
+        if self.solver_params.get('relative_gap') is not None:
+            parameters.relative_gap_limit = float(self.solver_params['relative_gap'])
+        if self.solver_params.get('random_seed') is not None:
+            parameters.random_seed = int(self.solver_params['random_seed'])
+
+    def _solve(self):
+        if self.stopped:
+            return cp_model.UNKNOWN
+        if self.on_solution is not None:
+            return self.solver.Solve(self.model, SolutionStreamCallback(self, self.on_solution))
+        return self.solver.Solve(self.model)
+
+    def _resolve_hints(self, hints):
+        instance = self.instance
+        resolved = {}
+        for exam_id, (room_id, start_time) in hints.items():
+            e_idx = instance.exam_index.get(exam_id)
+            if e_idx is not None and room_id in instance.room_index and start_time in instance.slot_index:
+                resolved[e_idx] = (instance.room_index[room_id], instance.slot_index[start_time])
+        return resolved
+
+    @contextmanager
+    def timed(self, phase):
+        """Ajouter au rapport la durée (en secondes) d'une étape"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            phases = self.report['phases']
+            phases[phase] = round(phases.get(phase, 0) + time.perf_counter() - started, 4)
+
+    def _report_solver(self, status):
+        """Ajouter au rapport la taille du modèle et les statistiques du solveur"""
+        proto = self.model.Proto()
+        self.report['variables'] = len(proto.variables)
+        self.report['constraints'] = len(proto.constraints)
+        solver = self.solver
+        stats = {
+            'status': solver.StatusName(status),
+            'objective': None,
+            'best_bound': None,
+            'gap': None,
+            'branches': solver.NumBranches(),
+            'conflicts': solver.NumConflicts(),
+            'wall_time': round(solver.WallTime(), 4),
+        }
+        if status == cp_model.OPTIMAL or status == cp_model.FEASIBLE:
+            stats['objective'] = solver.ObjectiveValue()
+            stats['best_bound'] = solver.BestObjectiveBound()
+            stats['gap'] = round(abs(stats['objective'] - stats['best_bound']) / max(1.0, abs(stats['objective'])), 6)
+        self.report['solver'] = stats
+
+    def _change_weight(self):
+        # Un déplacement coûte plus que le décalage maximal d'un examen
+        return len(self.time_slots)
 
     def create_schedule(self):
-        # Variables de décision
-        X = {}  # X[e, r, t] = 1 si l'examen e est dans la salle r au créneau t
-        Y = {}  # Y[e, p] = 1 si l'examen e est surveillé par le surveillant p
+        result = self.create_timetable()
+        if result['status'] == 'success':
+            with self.timed('proctors'):
+                self._assign_proctors(result)
+        self.report['status'] = result['status']
+        result['report'] = self.report
+        logger.info("Rapport de résolution : %s", self.report)
+        return result
 
-        # Initialisation des variables
-        for e_idx, exam in enumerate(self.exams):
-            for r_idx, room in enumerate(self.rooms):
-                for t_idx, time_slot in enumerate(self.time_slots):
-                    X[e_idx, r_idx, t_idx] = self.model.NewBoolVar(f'X_{e_idx}_{r_idx}_{t_idx}')
+    def create_timetable(self):
+        """Première étape : placer les examens dans les salles et les créneaux"""
+        if self.lns_budget is not None:
+            with self.timed('lns'):
+                return solve_lns(self, self.lns_budget)
 
-        for e_idx, exam in enumerate(self.exams):
-            for p_idx, proctor in enumerate(self.proctors):
-                Y[e_idx, p_idx] = self.model.NewBoolVar(f'Y_{e_idx}_{p_idx}')
+        if self.decompose:
+            started = time.perf_counter()
+            with self.timed('decomposition'):
+                result = solve_decomposed(self, max_workers=self.max_workers)
+            if result is not None:
+                logger.info("Problème décomposé en %d composantes", result['components'])
+                components = self.report['components']
+                self.report['variables'] = sum(report['variables'] or 0 for report in components)
+                self.report['constraints'] = sum(report['constraints'] or 0 for report in components)
+                return result
+            if self.stopped:
+                # Interrompue pendant la résolution des composantes : pas de modèle complet
+                return {'status': 'no_solution', 'results': [], 'presolve': {}}
+            # Le temps limite vaut pour toute la requête : le modèle complet n'a que le temps restant
+            if self.solver_params.get('time_limit') is not None:
+                remaining = float(self.solver_params['time_limit']) - (time.perf_counter() - started)
+                self.solver.parameters.max_time_in_seconds = max(0.0, remaining)
 
-        # 1. Chaque examen doit être affecté à une seule salle et un seul créneau
-        for e_idx, exam in enumerate(self.exams):
-            self.model.Add(sum(X[e_idx, r_idx, t_idx] for r_idx in range(len(self.rooms)) 
-                              for t_idx in range(len(self.time_slots))) == 1)
+        # Pré-traitement : salles et créneaux de début possibles pour chaque examen
+        with self.timed('presolve'):
+            self.presolve = Presolve(self.instance, self.spans, self.span_rows, self.fixed)
+        if not self.presolve.is_feasible():
+            return self._no_solution()
 
-        # 2. Respect de la durée des examens
-        for e_idx, exam in enumerate(self.exams):
-            # Conversion de la durée (ex: "2h30") en nombre de créneaux
-            duration_parts = exam.duration.split('h')
-            hours = int(duration_parts[0])
-            minutes = int(duration_parts[1]) if len(duration_parts) > 1 and duration_parts[1] else 0
-            total_minutes = hours * 60 + minutes
-
-            # Calculer le nombre de créneaux nécessaires (en supposant des créneaux de 30 min)
-            required_slots = (total_minutes + 29) // 30  # Arrondi au supérieur
-
-            for r_idx in range(len(self.rooms)):
-                for t_idx in range(len(self.time_slots) - required_slots + 1):
-                    # Si l'examen commence à t_idx, il doit occuper les créneaux jusqu'à t_idx + required_slots
-                    for dt in range(1, required_slots):
-                        # Si X[e_idx, r_idx, t_idx] = 1, alors X[e_idx, r_idx, t_idx + dt] doit être 1
-                        self.model.Add(X[e_idx, r_idx, t_idx + dt] >= X[e_idx, r_idx, t_idx])
+        with self.timed('build'):
+            if self.engine == 'interval':
+                self._build_interval_model()
+            else:
+                self._build_boolean_model()
 
-        # 3. Une salle ne peut pas accueillir plus d'un examen en même temps
-        for r_idx in range(len(self.rooms)):
-            for t_idx in range(len(self.time_slots)):
-                self.model.Add(sum(X[e_idx, r_idx, t_idx] for e_idx in range(len(self.exams))) <= 1)
-
-        # 4. Un surveillant ne peut surveiller qu'un seul examen à la fois
-        for p_idx in range(len(self.proctors)):
-            for t_idx in range(len(self.time_slots)):
-                exams_at_slot = []
-                for e_idx in range(len(self.exams)):
-                    for r_idx in range(len(self.rooms)):
-                        if X[e_idx, r_idx, t_idx] == 1:
-                            exams_at_slot.append(e_idx)
-                if exams_at_slot:
-                    self.model.Add(sum(Y[e_idx, p_idx] for e_idx in exams_at_slot) <= 1)
+        # Résolution
+        with self.timed('solve'):
+            status = self._solve()
+        self._report_solver(status)
+
+        # Traitement des résultats
+        if status == cp_model.OPTIMAL or status == cp_model.FEASIBLE:
+            with self.timed('extract'):
+                result = {'status': 'success', 'results': self.extract_results(self.solver.ResponseProto().solution)}
+        else:
+            result = {'status': 'no_solution', 'results': []}
+
+        logger.info("Pré-traitement (%s) : %s", self.engine, self.presolve.stats)
+        result['presolve'] = self.presolve.stats
+        return result
+
+    def _assign_proctors(self, result):
+        """Deuxième étape : affecter les surveillants une fois les examens fixés dans le temps"""
+        assignment, understaffed = assign_proctors(result['results'], self.exams, self.proctors)
+        for item in result['results']:
+            item['proctor_ids'] = assignment[item['exam_id']]
 
         # 5. Un examen doit être surveillé par au moins un surveillant
-        for e_idx in range(len(self.exams)):
-            self.model.Add(sum(Y[e_idx, p_idx] for p_idx in range(len(self.proctors))) >= 1)
+        if understaffed:
+            logger.info("Examens sans surveillant : %s", understaffed)
+            result['status'] = 'no_solution'
+            result['understaffed_exam_ids'] = understaffed
 
-        # 6. Les examens d'une même promotion ne peuvent pas être au même créneau
-        for e1_idx in range(len(self.exams)):
-            for e2_idx in range(e1_idx + 1, len(self.exams)):
-                if self.exams[e1_idx].level == self.exams[e2_idx].level:
-                    for t_idx in range(len(self.time_slots)):
-                        # Si les deux examens sont programmés au même créneau
-                        self.model.Add(
-                            sum(X[e1_idx, r_idx, t_idx] for r_idx in range(len(self.rooms))) +
-                            sum(X[e2_idx, r_idx, t_idx] for r_idx in range(len(self.rooms))) <= 1
-                        )
+    def _no_solution(self):
+        return {'status': 'no_solution', 'results': [], 'presolve': self.presolve.stats}
+
+    def _build_results(self, exam_indices, room_indices, slot_indices):
+        """Résultats des examens placés : examen, salle et créneau de début donnés par leurs indices"""
+        exam_ids = self.instance.exam_ids[exam_indices].tolist()
+        room_ids = self.instance.room_ids[room_indices].tolist()
+        slot_ids = self.instance.slot_ids[slot_indices].tolist()
+        durations = self.instance.durations[exam_indices].tolist()
+        results = []
+        for exam_id, room_id, slot_id, t_idx, duration in zip(
+            exam_ids, room_ids, slot_ids, slot_indices.tolist(), durations
+        ):
+            start_time = self.time_slots[t_idx].start_time
+            results.append({
+                'exam_id': exam_id,
+                'room_id': room_id,
+                'time_slot_id': slot_id,
+                'start_time': start_time,
+                'end_time': start_time + timedelta(minutes=duration),
+                'proctor_ids': []
+            })
+        return results
+
+    def extract_results(self, solution):
+        """
+        Construire les résultats à partir de la solution du solveur ou du callback
+        (solution[i] = valeur de la variable d'indice i du modèle), lue d'un bloc
+        """
+        values = np.fromiter(solution, dtype=np.int64, count=len(solution))
+        if self.engine == 'interval':
+            return self._extract_interval(values)
+        return self._extract_boolean(values)
+
+    def _build_boolean_model(self):
+        # Variables de décision, à plat : X[i] = 1 si l'examen x_exam[i] commence dans
+        # la salle x_room[i] au créneau x_start[i] (uniquement sur les domaines retenus
+        # par le pré-traitement, examen par examen, salle par salle puis créneau par créneau)
+        proto = self.model.Proto()
+        exam_count, slot_count = len(self.exams), len(self.time_slots)
+        candidate_rooms, candidate_starts = self.presolve.candidate_rooms, self.presolve.candidate_starts
+        sizes = np.array([len(rooms) * len(starts) for rooms, starts in zip(candidate_rooms, candidate_starts)],
+                         dtype=np.int64)
+        empty = [np.zeros(0, dtype=np.int64)]
+        x_exam = self.x_exam = np.repeat(np.arange(exam_count), sizes)
+        x_room = self.x_room = np.concatenate(
+            [np.repeat(rooms, len(starts)) for rooms, starts in zip(candidate_rooms, candidate_starts)] + empty
+        ).astype(np.int64)
+        x_start = self.x_start = np.concatenate(
+            [np.tile(starts, len(rooms)) for rooms, starts in zip(candidate_rooms, candidate_starts)] + empty
+        ).astype(np.int64)
+        # x_index[i] = indice de X[i] dans le modèle (les variables sont créées à la suite)
+        x_index = self.x_index = len(proto.variables) + np.arange(len(x_exam))
+        add_variable = proto.variables.add
+        for e_idx, r_idx, t_idx in zip(x_exam.tolist(), x_room.tolist(), x_start.tolist()):
+            add_variable(domain=(0, 1), name=f'X_{e_idx}_{r_idx}_{t_idx}')
 
+        self.presolve.count_removed_variables(len(x_index), exam_count * len(self.rooms) * slot_count)
+
+        # 2. Respect de la durée des examens : un examen qui commence en t occupe les
+        # créneaux t .. t + n - 1 qui commencent avant sa fin ; la variable u_var[k]
+        # occupe le créneau u_slot[k]
+        lengths = self.spans[self.span_rows[x_exam], x_start]
+        u_var = np.repeat(np.arange(len(x_index)), lengths)
+        u_slot = x_start[u_var] + np.arange(len(u_var)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        u_index = x_index[u_var]
+
+        # Démarrage à chaud : l'affectation actuelle sert de solution initiale
+        hint_room = np.full(exam_count, -1)
+        hint_start = np.full(exam_count, -1)
+        for e_idx, (r_idx, t_idx) in self.hints.items():
+            hint_room[e_idx], hint_start[e_idx] = r_idx, t_idx
+        hinted = hint_room[x_exam] >= 0
+        current = (x_room == hint_room[x_exam]) & (x_start == hint_start[x_exam])
+        proto.solution_hint.vars.extend(x_index[hinted].tolist())
+        proto.solution_hint.values.extend(current[hinted].astype(np.int64).tolist())
+
+        # 1. Chaque examen doit être affecté à une seule salle et un seul créneau
+        bounds = np.cumsum(sizes).tolist()
+        indices = x_index.tolist()
+        for e_idx in range(exam_count):
+            _add_exactly_one(proto, indices[bounds[e_idx] - sizes[e_idx]:bounds[e_idx]])
+
+        # 3. Une salle ne peut pas accueillir plus d'un examen en même temps
+        constrained = 0
+        for usage in _group(x_room[u_var] * slot_count + u_slot, u_index)[1]:
+            if len(usage) > 1:
+                _add_at_most_one(proto, usage)
+                constrained += 1
+        self.presolve.count_removed_constraints(len(self.rooms) * slot_count - constrained)
+
+        # 4 et 5. Les surveillants sont affectés après la résolution (voir _assign_proctors) ;
+        # on borne seulement le nombre d'examens simultanés par le nombre de surveillants
+        if self.proctor_capacity < exam_count:
+            for usage in _group(u_slot, u_index)[1]:
+                if len(usage) > self.proctor_capacity:
+                    _add_linear(proto, usage, [1] * len(usage), cp_model.INT_MIN, self.proctor_capacity)
+
+        # exam_usage[e, t] = indices des variables X qui font occuper le créneau t à l'examen e
+        keys, usages = _group(x_exam[u_var] * slot_count + u_slot, u_index)
+        exam_usage = dict(zip(zip((keys // slot_count).tolist(), (keys % slot_count).tolist()), usages))
+
+        # 6. Les examens d'une même promotion ne peuvent pas être au même créneau
         # 7. Une filière ne peut pas avoir deux examens en même temps (même promotions différentes)
+        if self.conflict_encoding == 'pairwise':
+            self._add_pairwise_conflicts(exam_usage)
+        else:
+            self._add_clique_conflicts(exam_usage)
+
+        # Fonction Objective : Minimiser le nombre de créneaux utilisés et équilibrer la charge ;
+        # la pénalité sum(1 - x) des affectations actuelles devient une constante moins sum(x)
+        weights = x_start.copy()
+        if self.minimal_change:
+            weights[current] -= self._change_weight()
+            proto.objective.offset = self._change_weight() * int(current.sum())
+        proto.objective.vars.extend(indices)
+        proto.objective.coeffs.extend(weights.tolist())
+
+    def _occupancy(self, exam_usage, e_idx, t_idx):
+        """Indice du littéral vrai si l'examen e occupe le créneau t (None s'il ne peut pas l'occuper)"""
+        key = (e_idx, t_idx)
+        if key not in self.occupancy:
+            usage = exam_usage.get(key)
+            if usage is None:
+                self.occupancy[key] = None
+            elif len(usage) == 1:
+                self.occupancy[key] = usage[0]
+            else:
+                # Au plus une variable X de la somme vaut 1 (contrainte 1)
+                proto = self.model.Proto()
+                occupied = _add_bool_var(proto, f'O_{e_idx}_{t_idx}')
+                _add_linear(proto, [occupied] + usage, [1] + [-1] * len(usage), 0, 0)
+                self.occupancy[key] = occupied
+        return self.occupancy[key]
+
+    def _exam_slots(self, exam_usage):
+        """exam_slots[e] = créneaux que l'examen e peut occuper"""
+        exam_slots = [[] for _ in self.exams]
+        for e_idx, t_idx in exam_usage:
+            exam_slots[e_idx].append(t_idx)
+        return exam_slots
+
+    def _add_clique_conflicts(self, exam_usage):
+        """
+        Une contrainte AtMostOne par groupe (promotion ou filière) et par créneau
+        sur les littéraux d'occupation des examens du groupe : taille linéaire
+        dans la taille des groupes.
+        """
+        proto = self.model.Proto()
+        self.occupancy = {}
+        exam_slots = self._exam_slots(exam_usage)
+        for group in self.instance.conflict_groups():
+            if len(group) < 2:
+                continue
+            literals = {}  # literals[t] = littéraux d'occupation du créneau t par les examens du groupe
+            for e_idx in group:
+                for t_idx in exam_slots[e_idx]:
+                    literals.setdefault(t_idx, []).append(self._occupancy(exam_usage, e_idx, t_idx))
+            constrained = 0
+            for slot_literals in literals.values():
+                if len(slot_literals) > 1:
+                    _add_at_most_one(proto, slot_literals)
+                    constrained += 1
+            self.presolve.count_removed_constraints(len(self.time_slots) - constrained)
+
+    def _add_pairwise_conflicts(self, exam_usage):
+        """Ancien encodage : une contrainte par paire d'examens en conflit et par créneau"""
+        levels = self.instance.levels.tolist()
+        departments = self.instance.departments.tolist()
+        proto = self.model.Proto()
+        exam_slots = [set(slots) for slots in self._exam_slots(exam_usage)]
         for e1_idx in range(len(self.exams)):
             for e2_idx in range(e1_idx + 1, len(self.exams)):
-                if self.exams[e1_idx].department == self.exams[e2_idx].department:
-                    for t_idx in range(len(self.time_slots)):
-                        self.model.Add(
-                            sum(X[e1_idx, r_idx, t_idx] for r_idx in range(len(self.rooms))) +
-                            sum(X[e2_idx, r_idx, t_idx] for r_idx in range(len(self.rooms))) <= 1
-                        )
-
-        # Fonction Objective : Minimiser le nombre de créneaux utilisés et équilibrer la charge
-        self.model.Minimize(
-            sum(t_idx * X[e_idx, r_idx, t_idx] 
-                for e_idx in range(len(self.exams)) 
-                for r_idx in range(len(self.rooms)) 
-                for t_idx in range(len(self.time_slots)))
-        )
+                if levels[e1_idx] != levels[e2_idx] and departments[e1_idx] != departments[e2_idx]:
+                    continue
+                shared = exam_slots[e1_idx] & exam_slots[e2_idx]
+                for t_idx in shared:
+                    usage = exam_usage[e1_idx, t_idx] + exam_usage[e2_idx, t_idx]
+                    _add_linear(proto, usage, [1] * len(usage), cp_model.INT_MIN, 1)
+                self.presolve.count_removed_constraints(len(self.time_slots) - len(shared))
 
-        # Résolution
-        status = self.solver.Solve(self.model)
+    def _extract_boolean(self, values):
+        # Variables X à 1, dans l'ordre des examens (une par examen)
+        chosen = np.flatnonzero(values[self.x_index])
+        return self._build_results(self.x_exam[chosen], self.x_room[chosen], self.x_start[chosen])
 
-        # Traitement des résultats
-        if status == cp_model.OPTIMAL or status == cp_model.FEASIBLE:
-            results = []
-            for e_idx, exam in enumerate(self.exams):
-                for r_idx, room in enumerate(self.rooms):
-                    for t_idx, time_slot in enumerate(self.time_slots):
-                        if self.solver.Value(X[e_idx, r_idx, t_idx]) == 1:
-                            # Trouver les surveillants assignés à cet examen
-                            assigned_proctors = []
-                            for p_idx, proctor in enumerate(self.proctors):
-                                if self.solver.Value(Y[e_idx, p_idx]) == 1:
-                                    assigned_proctors.append(proctor.id)
-
-                            # Calculer la durée de l'examen
-                            duration_parts = exam.duration.split('h')
-                            hours = int(duration_parts[0])
-                            minutes = int(duration_parts[1]) if len(duration_parts) > 1 and duration_parts[1] else 0
-
-                            # Créer une entrée pour le résultat
-                            results.append({
-                                'exam_id': exam.id,
-                                'room_id': room.id,
-                                'time_slot_id': time_slot.id,
-                                'start_time': time_slot.start_time,
-                                'end_time': time_slot.start_time + timedelta(hours=hours, minutes=minutes),
-                                'proctor_ids': assigned_proctors
-                            })
-            return {'status': 'success', 'results': results}
-        else:
-            return {'status': 'no_solution', 'results': []}
\ No newline at end of file
+    def _build_interval_model(self):
+        """
+        Modèle à base d'intervalles : le temps est mesuré en créneaux et chaque
+        examen possède une variable de début ainsi qu'un intervalle optionnel par
+        salle. La taille du modèle croît en E·R au lieu de E·R·T. Si les créneaux
+        n'ont pas tous la même durée, le nombre de créneaux occupés dépend du
+        début : il est alors lié au début par une table.
+        """
+        starts = self.starts = {}  # starts[e] = indice du créneau de début de l'examen e
+        intervals = {}             # intervals[e] = intervalle occupé par l'examen e
+        P = self.P = {}            # P[e, r] = 1 si l'examen e a lieu dans la salle r
+        kept = {}       # kept[e] = 1 si l'examen e garde son affectation actuelle
+
+        room_intervals = {r_idx: [] for r_idx in range(len(self.rooms))}
+
+        for e_idx, exam in enumerate(self.exams):
+            candidate_starts = self.presolve.candidate_starts[e_idx]
+            lengths = self.spans[self.span_rows[e_idx], candidate_starts].tolist()
+            ends = [t_idx + length for t_idx, length in zip(candidate_starts, lengths)]
+
+            start = self.model.NewIntVarFromDomain(
+                cp_model.Domain.FromValues(candidate_starts), f'start_{e_idx}'
+            )
+            end = self.model.NewIntVar(min(ends), max(ends), f'end_{e_idx}')
+            if min(lengths) == max(lengths):
+                length = lengths[0]
+            else:
+                length = self.model.NewIntVarFromDomain(
+                    cp_model.Domain.FromValues(sorted(set(lengths))), f'length_{e_idx}'
+                )
+                self.model.AddAllowedAssignments([start, length], list(zip(candidate_starts, lengths)))
+            starts[e_idx] = start
+            intervals[e_idx] = self.model.NewIntervalVar(start, length, end, f'I_{e_idx}')
+
+            # 1. Chaque examen a lieu dans une seule salle
+            for r_idx in self.presolve.candidate_rooms[e_idx]:
+                P[e_idx, r_idx] = self.model.NewBoolVar(f'P_{e_idx}_{r_idx}')
+                room_intervals[r_idx].append(self.model.NewOptionalIntervalVar(
+                    start, length, end, P[e_idx, r_idx], f'I_{e_idx}_{r_idx}'
+                ))
+            self.model.AddExactlyOne(P[e_idx, r_idx] for r_idx in self.presolve.candidate_rooms[e_idx])
+
+            # Démarrage à chaud : l'affectation actuelle sert de solution initiale
+            if e_idx in self.hints:
+                hint_room, hint_start = self.hints[e_idx]
+                self.model.AddHint(start, hint_start)
+                for r_idx in self.presolve.candidate_rooms[e_idx]:
+                    self.model.AddHint(P[e_idx, r_idx], r_idx == hint_room)
+                if self.minimal_change and (e_idx, hint_room) in P:
+                    kept[e_idx] = self.model.NewBoolVar(f'kept_{e_idx}')
+                    self.model.Add(start == hint_start).OnlyEnforceIf(kept[e_idx])
+                    self.model.AddImplication(kept[e_idx], P[e_idx, hint_room])
+
+        self.presolve.count_removed_variables(len(P), len(self.exams) * len(self.rooms))
+        # Indices des variables dans le modèle, pour l'extraction des résultats
+        self.p_exam = np.array([e_idx for e_idx, _ in P], dtype=np.int64)
+        self.p_room = np.array([r_idx for _, r_idx in P], dtype=np.int64)
+        self.p_index = np.array([literal.Index() for literal in P.values()], dtype=np.int64)
+        self.start_index = np.array([starts[e_idx].Index() for e_idx in range(len(self.exams))], dtype=np.int64)
+
+        # 2 et 3. Une salle ne peut pas accueillir deux examens qui se chevauchent
+        for r_idx in range(len(self.rooms)):
+            if len(room_intervals[r_idx]) > 1:
+                self.model.AddNoOverlap(room_intervals[r_idx])
+            else:
+                self.presolve.count_removed_constraints()
+
+        # 4 et 5. Les surveillants sont affectés après la résolution (voir _assign_proctors) ;
+        # on borne seulement le nombre d'examens simultanés par le nombre de surveillants
+        if self.proctor_capacity < len(self.exams):
+            self.model.AddCumulative(list(intervals.values()), [1] * len(intervals), self.proctor_capacity)
+
+        # 6 et 7. Pas de chevauchement au sein d'une même promotion ou d'une même filière
+        for group in self.instance.conflict_groups():
+            if len(group) > 1:
+                self.model.AddNoOverlap([intervals[e_idx] for e_idx in group])
+
+        # Fonction Objective : commencer les examens le plus tôt possible
+        objective = cp_model.LinearExpr.Sum(list(starts.values()))
+        if kept:
+            objective += self._change_weight() * (len(kept) - cp_model.LinearExpr.Sum(list(kept.values())))
+        self.model.Minimize(objective)
+
+    def _extract_interval(self, values):
+        # Variables P à 1, dans l'ordre des examens (une par examen)
+        chosen = np.flatnonzero(values[self.p_index])
+        exam_indices = self.p_exam[chosen]
+        return self._build_results(exam_indices, self.p_room[chosen], values[self.start_index][exam_indices])
@@ -0,0 +1,95 @@
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from rest_framework.pagination import CursorPagination
+
+# Nombre de lignes lues par requête en mode streaming
+STREAM_CHUNK_SIZE = 500
+# Taille de page par défaut et maximale de la pagination par curseur
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+
+
+def wants_stream(request):
+    """Le client demande-t-il une réponse en streaming (?stream=1) ?"""
+    return request.GET.get('stream', '').lower() in ('1', 'true', 'yes', 'on')
+
+
+class IdCursorPagination(CursorPagination):
+    """
+    Pagination par curseur (keyset) sur la clé primaire : chaque page est une
+    requête `WHERE id > ... ORDER BY id LIMIT n`, quel que soit le rang de la page.
+    """
+    ordering = 'id'
+    page_size = DEFAULT_LIMIT
+    page_size_query_param = 'limit'
+    max_page_size = MAX_LIMIT
+
+
+def stream_json_array(rows, **json_dumps_params):
+    """Écrire une liste JSON élément par élément"""
+    yield '['
+    for position, row in enumerate(rows):
+        yield (',' if position else '') + json.dumps(row, cls=DjangoJSONEncoder, **json_dumps_params)
+    yield ']'
+
+
+def streaming_json_response(rows, **json_dumps_params):
+    """Réponse JSON écrite au fil de l'eau : la mémoire utilisée ne dépend pas du nombre de lignes"""
+    return StreamingHttpResponse(stream_json_array(rows, **json_dumps_params), content_type='application/json')
+
+
+def keyset_page(queryset, cursor, limit):
+    """
+    Page de `limit` objets d'identifiant supérieur à `cursor`.
+    Retourne (objets, curseur de la page suivante ou None).
+    """
+    queryset = queryset.order_by('id')
+    if cursor is not None:
+        queryset = queryset.filter(id__gt=cursor)
+    objects = list(queryset[:limit + 1])
+    if len(objects) > limit:
+        return objects[:limit], objects[limit - 1].id
+    return objects, None
+
+
+def parse_keyset_params(params):
+    """
+    Lire ?cursor=<id>&limit=<n>. Retourne (cursor, limit), (None, None) si la
+    pagination n'est pas demandée ; lève ValueError si les valeurs sont invalides.
+    """
+    cursor = params.get('cursor')
+    limit = params.get('limit')
+    if cursor in (None, '') and limit in (None, ''):
+        return None, None
+    try:
+        cursor = int(cursor) if cursor not in (None, '') else None
+        limit = int(limit) if limit not in (None, '') else DEFAULT_LIMIT
+    except ValueError:
+        raise ValueError("cursor and limit must be integers")
+    if limit < 1:
+        raise ValueError("limit must be positive")
+    return cursor, min(limit, MAX_LIMIT)
+
+
+class StreamingListMixin:
+    """
+    Pour un ModelViewSet : `?stream=1` renvoie la liste complète (non paginée)
+    en lisant le queryset par blocs avec .iterator() et en écrivant le JSON au
+    fil de l'eau.
+    """
+    stream_chunk_size = STREAM_CHUNK_SIZE
+
+    def list(self, request, *args, **kwargs):
+        if not wants_stream(request):
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        serializer_class = self.get_serializer_class()
+        context = self.get_serializer_context()
+        rows = (
+            serializer_class(obj, context=context).data
+            for obj in queryset.iterator(chunk_size=self.stream_chunk_size)
+        )
+        return streaming_json_response(rows)
@@ -0,0 +1,77 @@
+import numpy as np
+
+
+class Presolve:
+    """
+    Pré-traitement des domaines avant la création des variables du modèle.
+
+    Pour chaque examen on calcule :
+    - les salles candidates (capacité suffisante), via un index des salles
+      trié par capacité ;
+    - les créneaux de début candidats, c'est-à-dire ceux pour lesquels
+      l'examen se termine le même jour, avant la fin du dernier créneau de
+      la journée et sans interruption (voir ProblemInstance.slot_spans).
+
+    Les examens fixés (fixed[e] = (indice de salle, indice de créneau)) n'ont
+    qu'une salle et un créneau de début candidats.
+    """
+
+    def __init__(self, instance, spans, span_rows, fixed=None):
+        self.instance = instance
+        self.spans = spans
+        self.span_rows = span_rows
+        self.fixed = fixed or {}
+
+        self.candidate_rooms = []   # candidate_rooms[e] = indices des salles possibles
+        self.candidate_starts = []  # candidate_starts[e] = indices des créneaux de début possibles
+        self.stats = {
+            'removed_rooms': 0,
+            'removed_starts': 0,
+            'removed_variables': 0,
+            'removed_constraints': 0,
+        }
+
+        self._build_candidate_rooms()
+        self._build_candidate_starts()
+
+    def _build_candidate_rooms(self):
+        # Index des salles trié par capacité croissante
+        capacities = self.instance.capacities
+        room_order = np.argsort(capacities, kind='stable')
+        first_fits = np.searchsorted(capacities[room_order], self.instance.participants, side='left').tolist()
+
+        # Les examens qui tiennent dans les mêmes salles partagent la même liste
+        rooms_by_first_fit = {}
+        for e_idx, first_fit in enumerate(first_fits):
+            if e_idx in self.fixed:
+                candidates = [self.fixed[e_idx][0]]
+            else:
+                if first_fit not in rooms_by_first_fit:
+                    rooms_by_first_fit[first_fit] = sorted(room_order[first_fit:].tolist())
+                candidates = rooms_by_first_fit[first_fit]
+            self.candidate_rooms.append(candidates)
+            self.stats['removed_rooms'] += len(capacities) - len(candidates)
+
+    def _build_candidate_starts(self):
+        # Les examens de même durée partagent la même liste de débuts possibles
+        slot_count = len(self.instance.time_slots)
+        starts_by_row = {}
+        for e_idx, row in enumerate(self.span_rows.tolist()):
+            if row not in starts_by_row:
+                starts_by_row[row] = np.flatnonzero(self.spans[row]).tolist()
+            candidates = starts_by_row[row]
+            if e_idx in self.fixed:
+                start = self.fixed[e_idx][1]
+                candidates = [start] if self.spans[row][start] else []
+            self.candidate_starts.append(candidates)
+            self.stats['removed_starts'] += slot_count - len(candidates)
+
+    def is_feasible(self):
+        """Chaque examen dispose-t-il d'au moins une salle et un créneau de début ?"""
+        return all(self.candidate_rooms) and all(self.candidate_starts)
+
+    def count_removed_variables(self, kept, total):
+        self.stats['removed_variables'] += total - kept
+
+    def count_removed_constraints(self, count=1):
+        self.stats['removed_constraints'] += count
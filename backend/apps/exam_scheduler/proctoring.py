@@ -0,0 +1,113 @@
+from datetime import date, datetime, timezone
+
+from ortools.graph.python import min_cost_flow
+
+# Coût d'un surveillant hors de la filière de l'examen
+AFFINITY_COST = 10
+# Coût marginal de chaque examen supplémentaire pour un même surveillant :
+# les coûts croissants répartissent la charge entre les surveillants
+WORKLOAD_COST = 1
+
+
+def _to_utc_naive(value):
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def is_available(proctor, start_time):
+    """
+    Un surveillant est disponible si sa liste de disponibilités est vide, ou
+    si elle contient l'heure de début de l'examen ("2024-05-15T08:00:00Z")
+    ou le jour de l'examen ("2024-05-15").
+    """
+    availability = getattr(proctor, 'availability', None)
+    if not availability:
+        return True
+
+    start_time = _to_utc_naive(start_time)
+    for entry in availability:
+        try:
+            if 'T' in entry:
+                if _to_utc_naive(datetime.fromisoformat(entry)) == start_time:
+                    return True
+            elif date.fromisoformat(entry) == start_time.date():
+                return True
+        except (TypeError, ValueError):
+            continue
+    return False
+
+
+def start_groups(results):
+    """Regrouper les examens placés par heure de début, dans l'ordre chronologique"""
+    groups = {}
+    for item in results:
+        groups.setdefault(item['start_time'], []).append(item)
+    return [groups[start_time] for start_time in sorted(groups)]
+
+
+def _match_group(group, free_proctors, exams_by_id, workload, proctors_per_exam):
+    """
+    Affecter les surveillants libres aux examens qui commencent au même moment
+    par un flot de coût minimum :
+
+        source -> surveillant -> examen -> puits
+
+    L'arc source -> surveillant coûte la charge actuelle du surveillant
+    (équilibrage), l'arc vers un examen d'une autre filière coûte AFFINITY_COST.
+    """
+    flow = min_cost_flow.SimpleMinCostFlow()
+    source, sink = 0, 1
+    exam_nodes = {}
+    for node, item in enumerate(group, start=2):
+        exam_nodes[item['exam_id']] = node
+        flow.add_arc_with_capacity_and_unit_cost(node, sink, proctors_per_exam, 0)
+
+    arcs = []  # (arc, exam_id, proctor)
+    for node, proctor in enumerate(free_proctors, start=2 + len(group)):
+        flow.add_arc_with_capacity_and_unit_cost(source, node, 1, workload[proctor.id] * WORKLOAD_COST)
+        for item in group:
+            if not is_available(proctor, item['start_time']):
+                continue
+            exam = exams_by_id[item['exam_id']]
+            cost = 0 if proctor.department == exam.department else AFFINITY_COST
+            arcs.append((flow.add_arc_with_capacity_and_unit_cost(node, exam_nodes[item['exam_id']], 1, cost),
+                         item['exam_id'], proctor))
+
+    demand = len(group) * proctors_per_exam
+    flow.set_node_supply(source, demand)
+    flow.set_node_supply(sink, -demand)
+    if flow.solve_max_flow_with_min_cost() != flow.OPTIMAL:
+        return []
+    return [(exam_id, proctor) for arc, exam_id, proctor in arcs if flow.flow(arc) > 0]
+
+
+def assign_proctors(results, exams, proctors, proctors_per_exam=1):
+    """
+    Affecter les surveillants aux examens déjà placés dans le temps. Les
+    examens sont parcourus par heure de début ; à chaque instant, un flot de
+    coût minimum affecte les surveillants libres (aucun examen en cours) aux
+    examens qui commencent. Sur un graphe d'intervalles, ce parcours
+    chronologique trouve une affectation dès que le nombre d'examens
+    simultanés ne dépasse pas le nombre de surveillants.
+    Retourne (affectation {exam_id: [proctor_id, ...]}, exam_ids insuffisamment surveillés).
+    """
+    exams_by_id = {exam.id: exam for exam in exams}
+    workload = {proctor.id: 0 for proctor in proctors}
+    busy_until = {proctor.id: None for proctor in proctors}
+
+    assignment = {item['exam_id']: [] for item in results}
+    for group in start_groups(results):
+        start_time = group[0]['start_time']
+        free_proctors = [
+            proctor for proctor in proctors
+            if busy_until[proctor.id] is None or busy_until[proctor.id] <= start_time
+        ]
+        ends = {item['exam_id']: item['end_time'] for item in group}
+        for exam_id, proctor in _match_group(group, free_proctors, exams_by_id, workload, proctors_per_exam):
+            assignment[exam_id].append(proctor.id)
+            workload[proctor.id] += 1
+            busy_until[proctor.id] = ends[exam_id]
+
+    understaffed = [exam_id for exam_id, proctor_ids in assignment.items() if len(proctor_ids) < proctors_per_exam]
+    return assignment, understaffed
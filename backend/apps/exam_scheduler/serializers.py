@@ -1,5 +1,18 @@
 from rest_framework import serializers
-from .models import Room, Proctor, Exam, TimeSlot
+from .durations import format_duration, parse_duration
+from .models import Room, Proctor, Exam, TimeSlot, ScheduleJob
+
+class ExamDurationField(serializers.Field):
+    """Durée stockée en minutes, lue et écrite au format "2h30" (ou en minutes)"""
+
+    def to_representation(self, value):
+        return format_duration(value)
+
+    def to_internal_value(self, data):
+        try:
+            return parse_duration(data)
+        except ValueError:
+            raise serializers.ValidationError('Invalid duration: use "2h30", "2h" or a number of minutes.')
 
 class RoomSerializer(serializers.ModelSerializer):
     class Meta:
@@ -12,9 +25,11 @@ class ProctorSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 class ExamSerializer(serializers.ModelSerializer):
+    duration = ExamDurationField(source='duration_minutes')
+
     class Meta:
         model = Exam
-        fields = '__all__'
+        exclude = ('duration_minutes',)
 
 class TimeSlotSerializer(serializers.ModelSerializer):
     class Meta:
@@ -24,7 +39,13 @@ class TimeSlotSerializer(serializers.ModelSerializer):
 class ExamDetailSerializer(serializers.ModelSerializer):
     room = RoomSerializer(read_only=True)
     proctors = ProctorSerializer(many=True, read_only=True)
+    duration = ExamDurationField(source='duration_minutes')
     
     class Meta:
         model = Exam
-        fields = '__all__'
\ No newline at end of file
+        exclude = ('duration_minutes',)
+
+class ScheduleJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ScheduleJob
+        exclude = ('result', 'heartbeat_at', 'progress')
\ No newline at end of file
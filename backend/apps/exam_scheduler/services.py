@@ -0,0 +1,322 @@
+import time
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from . import metrics, solution_cache
+from .instance import EXAM_FIELDS, PROCTOR_FIELDS, ROOM_FIELDS, TIME_SLOT_FIELDS, ProblemInstance
+from .models import Room, Proctor, Exam, TimeSlot, SolveHistory, ModelVersion
+from .optimizer import ExamScheduler
+from .stats import invalidate_stats
+from .timeslots import set_period_constraint
+from .versions import bump_versions
+
+
+# Paramètres du solveur acceptés par l'API et leur type
+SOLVER_PARAMS = {
+    'time_limit': float,
+    'num_workers': int,
+    'relative_gap': float,
+    'random_seed': int,
+}
+
+
+# Tables lues par le solveur : une écriture dans l'une d'elles périme un emploi du temps en cours de calcul
+INPUT_MODELS = (Exam, Room, Proctor, TimeSlot)
+
+
+class MissingDataError(Exception):
+    """Il manque des examens, des salles, des surveillants ou des créneaux pour planifier"""
+
+
+class ScheduleConflictError(Exception):
+    """Les données de planification ont changé pendant la résolution : l'emploi du temps calculé est périmé"""
+
+
+def _flag(value):
+    # Les paramètres de requête GET arrivent sous forme de chaînes
+    if isinstance(value, str):
+        return value.lower() in ('1', 'true', 'yes', 'on')
+    return bool(value)
+
+
+def parse_options(data):
+    """Lire et valider les options de planification envoyées par le client"""
+    options = {
+        'engine': data.get('engine', 'boolean'),
+        'decompose': _flag(data.get('decompose', False)),
+        # Démarrage à chaud : replanifier tous les examens à partir des affectations actuelles
+        'warm_start': _flag(data.get('warm_start', False)),
+        'minimal_change': _flag(data.get('minimal_change', False)),
+        # Réutiliser l'emploi du temps déjà calculé pour une entrée identique
+        'cache': _flag(data.get('cache', True)),
+        # Budget (en secondes) de la recherche à grand voisinage, pour les très grandes sessions
+        'lns_budget': None,
+        'solver_params': {},
+    }
+    if options['engine'] not in ExamScheduler.ENGINES:
+        raise ValueError(f"Unknown engine: {options['engine']}")
+
+    if data.get('lns_budget') not in (None, ''):
+        try:
+            options['lns_budget'] = float(data.get('lns_budget'))
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid value for lns_budget: {data.get('lns_budget')}")
+        # Les voisinages sont ré-optimisés sur l'objectif seul (voir lns.solve_lns)
+        if options['minimal_change']:
+            raise ValueError("lns_budget cannot be combined with minimal_change")
+
+    for name, cast in SOLVER_PARAMS.items():
+        if data.get(name) in (None, ''):
+            continue
+        try:
+            options['solver_params'][name] = cast(data.get(name))
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid value for {name}: {data.get(name)}")
+    return options
+
+
+def current_assignments():
+    """Affectations actuelles {exam_id: (room_id, start_time)} lues dans Exam.room et TimeSlot.exam"""
+    return {
+        exam_id: (room_id, start_time)
+        for exam_id, room_id, start_time in TimeSlot.objects.filter(
+            exam__isnull=False, exam__room__isnull=False
+        ).values_list('exam_id', 'exam__room_id', 'start_time')
+    }
+
+
+def input_versions():
+    """
+    Versions {label: version} des tables lues par le solveur, à lire avant le
+    chargement. Les lignes manquantes sont créées pour pouvoir être verrouillées
+    à l'écriture (voir save_schedule).
+    """
+    labels = {model._meta.label_lower for model in INPUT_MODELS}
+    versions = dict(ModelVersion.objects.filter(label__in=labels).values_list('label', 'version'))
+    if len(versions) < len(labels):
+        ModelVersion.objects.bulk_create(
+            [ModelVersion(label=label, version=0, updated_at=timezone.now()) for label in labels - set(versions)],
+            ignore_conflicts=True,
+        )
+        versions = dict(ModelVersion.objects.filter(label__in=labels).values_list('label', 'version'))
+    return versions
+
+
+def instance_querysets(warm_start=False):
+    """Requêtes (values_list, sans instancier de modèles) des examens, salles, surveillants et créneaux"""
+    if warm_start:
+        exams = Exam.objects.order_by('id')
+        time_slots = TimeSlot.objects.order_by('start_time', 'id')
+    else:
+        # Parcourus par les index partiels exam_unscheduled et timeslot_free_start_time
+        exams = Exam.objects.filter(room__isnull=True).order_by('id')
+        time_slots = TimeSlot.objects.filter(exam__isnull=True).order_by('start_time', 'id')
+    return (
+        exams.values_list(*EXAM_FIELDS),
+        Room.objects.values_list(*ROOM_FIELDS),
+        Proctor.objects.values_list(*PROCTOR_FIELDS),
+        time_slots.values_list(*TIME_SLOT_FIELDS),
+    )
+
+
+def load_instance(warm_start=False):
+    """
+    Lire les données de planification en une requête par table dans un
+    instantané ProblemInstance
+    """
+    return ProblemInstance(*instance_querysets(warm_start))
+
+
+def build_scheduler(options, on_solution=None):
+    """Charger les données de planification et construire le planificateur"""
+    started = time.perf_counter()
+    versions = input_versions()
+    instance = load_instance(options['warm_start'])
+    if not instance.is_complete():
+        raise MissingDataError()
+    hints = current_assignments() if options['warm_start'] else None
+
+    scheduler = ExamScheduler.from_instance(
+        instance,
+        engine=options['engine'],
+        decompose=options['decompose'],
+        hints=hints,
+        minimal_change=options['minimal_change'],
+        solver_params=options.get('solver_params'),
+        lns_budget=options.get('lns_budget'),
+        on_solution=on_solution,
+    )
+    scheduler.report['phases']['load'] = round(time.perf_counter() - started, 4)
+    # Versions des données au chargement, vérifiées avant d'écrire le résultat
+    scheduler.input_versions = versions
+    return scheduler
+
+
+def solve_schedule(scheduler, options):
+    """
+    Résoudre le problème, ou reprendre l'emploi du temps déjà calculé pour la
+    même entrée (mêmes examens, salles, surveillants, créneaux et options).
+    Le rapport de résolution est ajouté au résultat et à l'historique.
+    """
+    use_cache = options.get('cache', True)
+    result = None
+    if use_cache:
+        with scheduler.timed('cache'):
+            key = solution_cache.instance_key(scheduler, options)
+            result = solution_cache.lookup(key)
+
+    if result is not None:
+        scheduler.report['status'] = result['status']
+        result['report'] = dict(scheduler.report, cached=True)
+    else:
+        result = scheduler.create_schedule()
+        # Une résolution interrompue n'est pas conservée
+        if use_cache and result['status'] == 'success' and not scheduler.stopped:
+            solution_cache.store(key, result)
+
+    result['report']['wall_time'] = round(sum(result['report']['phases'].values()), 4)
+    record_solve(result['report'], options)
+    metrics.record_solve(result['report'])
+    return result
+
+
+def record_solve(report, options):
+    """Conserver un rapport de résolution dans l'historique"""
+    solver = report['solver'] or {}
+    SolveHistory.objects.create(
+        engine=report['engine'],
+        status=report['status'],
+        cached=report.get('cached', False),
+        exams=report['exams'],
+        rooms=report['rooms'],
+        time_slots=report['time_slots'],
+        variables=report['variables'],
+        constraints=report['constraints'],
+        solver_status=solver.get('status', ''),
+        objective=solver.get('objective'),
+        best_bound=solver.get('best_bound'),
+        gap=solver.get('gap'),
+        branches=solver.get('branches'),
+        conflicts=solver.get('conflicts'),
+        wall_time=report['wall_time'],
+        phases=report['phases'],
+        options=options,
+    )
+
+
+def replace_proctors(assignment):
+    """
+    Remplacer les surveillants des examens ({exam_id: [proctor_id, ...]}) dans la
+    table d'association : deux requêtes, à appeler dans une transaction.
+    """
+    ExamProctor = Exam.proctors.through
+    ExamProctor.objects.filter(exam_id__in=list(assignment)).delete()
+    ExamProctor.objects.bulk_create([
+        ExamProctor(exam_id=exam_id, proctor_id=proctor_id)
+        for exam_id, proctor_ids in assignment.items() for proctor_id in proctor_ids
+    ])
+
+
+def save_schedule(result, warm_start=False, versions=None):
+    """
+    Mettre à jour la base de données avec les résultats : un nombre constant de
+    requêtes, dans une seule transaction (aucun emploi du temps à moitié écrit).
+    Avec `versions` (voir input_versions), les écritures sont sérialisées par un
+    verrou sur les compteurs des tables lues, et ScheduleConflictError est levée
+    si ces tables ont changé depuis le chargement (autre planification, saisie)
+    ou si un créneau écrit viole l'unicité salle/période.
+    """
+    items = result['results']
+    exam_ids = [item['exam_id'] for item in items]
+
+    try:
+        with transaction.atomic():
+            if versions is not None:
+                current = dict(
+                    ModelVersion.objects.select_for_update().filter(label__in=versions).order_by('label')
+                    .values_list('label', 'version')
+                )
+                if current != versions:
+                    raise ScheduleConflictError()
+
+            exams = Exam.objects.in_bulk(exam_ids)
+            rooms = Room.objects.in_bulk({item['room_id'] for item in items})
+            time_slots = TimeSlot.objects.in_bulk({item['time_slot_id'] for item in items})
+            for model, objects, key in ((Exam, exams, 'exam_id'), (Room, rooms, 'room_id'),
+                                        (TimeSlot, time_slots, 'time_slot_id')):
+                missing = {item[key] for item in items} - set(objects)
+                if missing:
+                    raise model.DoesNotExist(f"{model.__name__} introuvable(s) : {sorted(missing)}")
+
+            # Démarrage à chaud : chaque examen replanifié réutilise son créneau actuel
+            previous_slots = {}
+            if warm_start:
+                stale = []
+                for time_slot in TimeSlot.objects.filter(exam_id__in=exam_ids):
+                    if time_slot.exam_id in previous_slots:
+                        stale.append(time_slot.id)
+                    else:
+                        previous_slots[time_slot.exam_id] = time_slot
+                TimeSlot.objects.filter(id__in=stale).update(exam=None)
+
+            # Mettre à jour les examens
+            for item in items:
+                exams[item['exam_id']].room = rooms[item['room_id']]
+            Exam.objects.bulk_update(exams.values(), ['room'])
+
+            replace_proctors({item['exam_id']: item['proctor_ids'] for item in items})
+
+            # Mettre à jour les créneaux. Un créneau libre qui a déjà la salle et les
+            # heures d'un examen est réutilisé (unicité salle/période) ; sinon l'examen
+            # garde son créneau actuel ou prend le créneau choisi par le solveur.
+            # Plusieurs examens peuvent commencer au même créneau (dans des salles
+            # différentes) : chacun au-delà du premier reçoit son propre créneau.
+            free_slots = {
+                (time_slot.room_id, time_slot.start_time, time_slot.end_time): time_slot
+                for time_slot in TimeSlot.objects.filter(
+                    exam__isnull=True, room_id__in=rooms, start_time__in={item['start_time'] for item in items}
+                )
+            }
+            claimed = {time_slot.id for time_slot in previous_slots.values()}
+            updated_slots = []
+            new_slots = []
+            for item in items:
+                free_slot = free_slots.pop((item['room_id'], item['start_time'], item['end_time']), None)
+                if free_slot is not None and free_slot.id not in claimed:
+                    claimed.add(free_slot.id)
+                    time_slot = free_slot
+                    if item['exam_id'] in previous_slots:
+                        previous_slot = previous_slots.pop(item['exam_id'])
+                        previous_slot.exam = None
+                        updated_slots.append(previous_slot)
+                elif item['exam_id'] in previous_slots:
+                    time_slot = previous_slots[item['exam_id']]
+                elif item['time_slot_id'] not in claimed:
+                    claimed.add(item['time_slot_id'])
+                    time_slot = time_slots[item['time_slot_id']]
+                else:
+                    time_slot = TimeSlot()
+                    new_slots.append(time_slot)
+                if time_slot.pk is not None:
+                    updated_slots.append(time_slot)
+                time_slot.exam = exams[item['exam_id']]
+                time_slot.start_time = item['start_time']
+                time_slot.end_time = item['end_time']
+                time_slot.room = rooms[item['room_id']]
+            TimeSlot.objects.bulk_update(updated_slots, ['exam', 'start_time', 'end_time', 'room'])
+            TimeSlot.objects.bulk_create(new_slots)
+
+            # Mettre à jour le statut des salles
+            Room.objects.filter(id__in=rooms).update(status='occupied')
+
+            # Vérifier l'unicité salle/période avant la validation : un créneau créé
+            # entre-temps pour la même salle et les mêmes heures lève l'erreur ici
+            set_period_constraint('IMMEDIATE')
+            set_period_constraint('DEFERRED')
+
+            # Les écritures en masse n'envoient pas de signaux
+            invalidate_stats()
+            bump_versions(Exam, TimeSlot, Room)
+    except IntegrityError as e:
+        raise ScheduleConflictError() from e
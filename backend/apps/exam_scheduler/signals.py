@@ -0,0 +1,50 @@
+from django.core.signals import request_started
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Room, Proctor, Exam, TimeSlot, ScheduleJob
+from .stats import invalidate_stats
+from .versions import bump_versions
+
+
+@receiver(post_save, sender=Room)
+@receiver(post_save, sender=Proctor)
+@receiver(post_save, sender=Exam)
+@receiver(post_save, sender=TimeSlot)
+@receiver(post_delete, sender=Room)
+@receiver(post_delete, sender=Proctor)
+@receiver(post_delete, sender=Exam)
+@receiver(post_delete, sender=TimeSlot)
+@receiver(m2m_changed, sender=Exam.proctors.through)
+def invalidate_stats_on_change(sender, **kwargs):
+    invalidate_stats()
+
+
+@receiver(post_save, sender=Room)
+@receiver(post_save, sender=Proctor)
+@receiver(post_save, sender=Exam)
+@receiver(post_save, sender=TimeSlot)
+@receiver(post_save, sender=ScheduleJob)
+@receiver(post_delete, sender=Room)
+@receiver(post_delete, sender=Proctor)
+@receiver(post_delete, sender=Exam)
+@receiver(post_delete, sender=TimeSlot)
+@receiver(post_delete, sender=ScheduleJob)
+def bump_version_on_change(sender, **kwargs):
+    bump_versions(sender)
+
+
+@receiver(m2m_changed, sender=Exam.proctors.through)
+def bump_exam_version_on_proctors_change(sender, action, **kwargs):
+    # Les surveillants font partie de la représentation d'un examen
+    if action.startswith('post_'):
+        bump_versions(Exam)
+
+
+@receiver(request_started, dispatch_uid='exam_scheduler.recover_stale_jobs')
+def recover_stale_jobs_on_startup(sender, **kwargs):
+    # Au démarrage du processus (première requête, pas dans ready() qui ne doit
+    # pas accéder à la base) : les jobs laissés par un processus arrêté échouent
+    request_started.disconnect(dispatch_uid='exam_scheduler.recover_stale_jobs')
+    from .jobs import recover_stale_jobs
+    recover_stale_jobs()
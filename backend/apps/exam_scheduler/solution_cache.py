@@ -0,0 +1,89 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import CachedSolution
+from .versions import bump_versions
+
+# Nombre maximal d'emplois du temps conservés ; au-delà, les moins récemment utilisés sont supprimés
+MAX_ENTRIES = getattr(settings, 'SOLUTION_CACHE_SIZE', 50)
+# Compteurs de succès et d'échecs, affichés dans les statistiques
+HITS_KEY = 'exam_scheduler:solution_cache:hits'
+MISSES_KEY = 'exam_scheduler:solution_cache:misses'
+# Options qui ne changent pas le problème résolu
+IGNORED_OPTIONS = ('cache',)
+
+
+def instance_key(scheduler, options):
+    """
+    Empreinte SHA-256 de l'entrée du solveur : examens, salles, surveillants et
+    créneaux triés par identifiant, options de résolution et, si les
+    changements sont pénalisés, affectations actuelles.
+    """
+    instance = scheduler.instance
+    payload = {
+        'exams': sorted(instance.exams, key=lambda exam: exam.id),
+        'rooms': sorted(instance.rooms, key=lambda room: room.id),
+        'proctors': sorted(
+            (proctor.id, proctor.department, sorted(proctor.availability or []))
+            for proctor in instance.proctors
+        ),
+        'time_slots': instance.time_slots,
+        'options': {name: value for name, value in options.items() if name not in IGNORED_OPTIONS},
+        'hints': sorted(
+            (instance.exams[e_idx].id, instance.rooms[r_idx].id, t_idx)
+            for e_idx, (r_idx, t_idx) in scheduler.hints.items()
+        ) if options.get('minimal_change') else [],
+    }
+    canonical = json.dumps(payload, cls=DjangoJSONEncoder, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def _count(key):
+    cache.add(key, 0, timeout=None)
+    cache.incr(key)
+
+
+def lookup(key):
+    """Emploi du temps déjà calculé pour cette empreinte, ou None"""
+    entry = CachedSolution.objects.filter(key=key).values_list('id', 'result').first()
+    # Les statistiques (et leur ETag) dépendent des compteurs
+    bump_versions(CachedSolution)
+    if entry is None:
+        _count(MISSES_KEY)
+        return None
+
+    entry_id, result = entry
+    CachedSolution.objects.filter(id=entry_id).update(last_used_at=timezone.now(), hits=F('hits') + 1)
+    _count(HITS_KEY)
+    # Les dates sont stockées en texte dans le JSON
+    for item in result['results']:
+        item['start_time'] = parse_datetime(item['start_time'])
+        item['end_time'] = parse_datetime(item['end_time'])
+    result['cached'] = True
+    return result
+
+
+def store(key, result):
+    """Conserver un emploi du temps et supprimer les entrées les moins récemment utilisées"""
+    CachedSolution.objects.update_or_create(key=key, defaults={'result': result, 'last_used_at': timezone.now()})
+    stale = list(CachedSolution.objects.order_by('-last_used_at').values_list('id', flat=True)[MAX_ENTRIES:])
+    if stale:
+        CachedSolution.objects.filter(id__in=stale).delete()
+
+
+def cache_stats():
+    """Compteurs de succès et d'échecs du cache"""
+    hits = cache.get(HITS_KEY, 0)
+    misses = cache.get(MISSES_KEY, 0)
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hitRate': round(hits / (hits + misses) * 100, 1) if hits + misses else 0,
+    }
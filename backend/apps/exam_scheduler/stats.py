@@ -0,0 +1,72 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q
+
+from .models import Room, Proctor, Exam, TimeSlot
+from .solution_cache import cache_stats
+
+# Instantané des statistiques du tableau de bord, invalidé à chaque modification
+# (signaux, voir signals.py, et écritures en masse, voir invalidate_stats)
+STATS_CACHE_KEY = 'exam_scheduler:stats'
+
+
+def _percentage(part, total):
+    return round(part / total * 100, 1) if total else 0
+
+
+def compute_stats():
+    """Calculer toutes les statistiques en quatre requêtes d'agrégation"""
+    departments = list(
+        Exam.objects.values('department').annotate(count=Count('id')).order_by('department')
+    )
+    rooms = Room.objects.aggregate(
+        total=Count('id', distinct=True),
+        occupied=Count('id', filter=Q(exam__isnull=False), distinct=True),
+    )
+    proctors = Proctor.objects.aggregate(
+        total=Count('id', distinct=True),
+        assigned=Count('id', filter=Q(exam__isnull=False), distinct=True),
+    )
+    time_slots = TimeSlot.objects.aggregate(total=Count('id'), with_exam=Count('exam'))
+
+    total_exams = sum(department['count'] for department in departments)
+    return {
+        'totalExams': total_exams,
+        'totalRooms': rooms['total'],
+        'totalProctors': proctors['total'],
+        # Part des salles qui accueillent au moins un examen
+        'roomOccupation': _percentage(rooms['occupied'], rooms['total']),
+        # Part des surveillants affectés à au moins un examen
+        'proctorDistribution': _percentage(proctors['assigned'], proctors['total']),
+        # Part des créneaux occupés par un examen
+        'timeSlotBalance': _percentage(time_slots['with_exam'], time_slots['total']),
+        'examsByDepartment': [
+            {
+                'department': department['department'],
+                'count': department['count'],
+                'percentage': _percentage(department['count'], total_exams),
+            }
+            for department in departments
+        ],
+    }
+
+
+def get_stats():
+    """
+    Statistiques du tableau de bord, recalculées seulement après une
+    modification, et compteurs du cache des emplois du temps
+    """
+    stats = cache.get(STATS_CACHE_KEY)
+    if stats is None:
+        stats = compute_stats()
+        cache.set(STATS_CACHE_KEY, stats, timeout=None)
+    return dict(stats, solutionCache=cache_stats())
+
+
+def invalidate_stats():
+    """
+    Invalider l'instantané après la validation de la transaction en cours. À
+    appeler après les écritures qui n'envoient pas de signaux (update,
+    bulk_update, bulk_create).
+    """
+    transaction.on_commit(lambda: cache.delete(STATS_CACHE_KEY))
@@ -0,0 +1,114 @@
+import math
+import random
+from datetime import datetime, timedelta, timezone
+
+from .instance import ExamRow, ProblemInstance, ProctorRow, RoomRow, TimeSlotRow
+from .models import Exam
+
+# Répartition par défaut des durées (minutes: poids) et des capacités de salles (places: poids)
+DURATION_WEIGHTS = {60: 2, 90: 3, 120: 4, 180: 1}
+CAPACITY_WEIGHTS = {30: 4, 50: 4, 80: 3, 120: 2, 250: 1}
+# Journée d'examens : de DAY_START à DAY_END heures, créneaux de SLOT_MINUTES minutes
+DAY_START = 8
+DAY_END = 18
+SLOT_MINUTES = 30
+FIRST_DAY = datetime(2025, 6, 2, tzinfo=timezone.utc)  # un lundi
+# Nombre moyen d'examens par promotion et par filière quand leur nombre n'est pas imposé
+EXAMS_PER_LEVEL = 12
+EXAMS_PER_DEPARTMENT = 40
+# Marge sur le nombre de jours et de salles calculés quand ils ne sont pas imposés
+MARGIN = 1.3
+
+
+def _names(choices, count):
+    """Codes des choix du modèle, complétés par des codes numérotés s'il en faut davantage"""
+    codes = [code for code, _ in choices]
+    return [codes[i] if i < len(codes) else f'{codes[i % len(codes)]}_{i // len(codes)}' for i in range(count)]
+
+
+def _weighted(rnd, weights, count):
+    return rnd.choices(list(weights), weights=list(weights.values()), k=count)
+
+
+def generate_instance(exams, rooms=None, proctors=None, days=None, levels=None, departments=None,
+                      level_weights=None, department_weights=None,
+                      durations=DURATION_WEIGHTS, capacities=CAPACITY_WEIGHTS, seed=0):
+    """
+    Session d'examens aléatoire et reproductible (même graine, même instance) :
+    - promotions et filières tirées selon level_weights / department_weights
+      (listes de poids, uniformes par défaut) ;
+    - durées et capacités des salles tirées selon `durations` et `capacities`
+      ({valeur: poids}) ; toutes les capacités sont représentées ;
+    - effectif de chaque examen entre la moitié et la totalité d'une capacité
+      tirée selon la même répartition que les salles.
+    Sans valeur imposée, il y a environ EXAMS_PER_LEVEL examens par promotion
+    et EXAMS_PER_DEPARTMENT par filière, le nombre de jours suffit à la
+    promotion ou filière la plus chargée, le nombre de salles de chaque taille
+    à la charge des examens qui ne tiennent pas dans une salle plus petite
+    (avec une marge), et il y a un surveillant pour quatre examens.
+    """
+    rnd = random.Random(seed)
+    levels = levels or max(1, round(exams / EXAMS_PER_LEVEL))
+    departments = departments or max(1, round(exams / EXAMS_PER_DEPARTMENT))
+    level_names = _names(Exam.LEVEL_CHOICES, levels)
+    department_names = _names(Exam.DEPARTMENT_CHOICES, departments)
+
+    exam_levels = rnd.choices(level_names, weights=level_weights, k=exams)
+    exam_departments = rnd.choices(department_names, weights=department_weights, k=exams)
+    exam_durations = _weighted(rnd, durations, exams)
+    exam_sizes = _weighted(rnd, capacities, exams)
+    exam_rows = [
+        ExamRow(
+            id=e_idx + 1,
+            duration_minutes=exam_durations[e_idx],
+            level=exam_levels[e_idx],
+            department=exam_departments[e_idx],
+            participants=rnd.randint(size // 2, size),
+        )
+        for e_idx, size in enumerate(exam_sizes)
+    ]
+
+    # Charge en créneaux : par promotion et par filière (examens successifs) et totale
+    slots_per_day = (DAY_END - DAY_START) * 60 // SLOT_MINUTES
+    demand = [math.ceil(minutes / SLOT_MINUTES) for minutes in exam_durations]
+    group_demand = {}
+    for e_idx, exam in enumerate(exam_rows):
+        for key in (('level', exam.level), ('department', exam.department)):
+            group_demand[key] = group_demand.get(key, 0) + demand[e_idx]
+    if days is None:
+        days = max(1, math.ceil(max(group_demand.values(), default=0) * MARGIN / slots_per_day))
+    if proctors is None:
+        proctors = max(2, exams // 4)
+
+    if rooms is None:
+        # De la plus grande taille à la plus petite : assez de salles (avec une marge)
+        # pour les examens qui ne tiennent pas dans une salle de la taille inférieure
+        room_capacities = []
+        sizes = sorted(capacities, reverse=True)
+        for position, capacity in enumerate(sizes):
+            smaller = sizes[position + 1] if position + 1 < len(sizes) else 0
+            load = sum(demand[e_idx] for e_idx, exam in enumerate(exam_rows) if exam.participants > smaller)
+            needed = max(len(room_capacities) + 1, math.ceil(load * MARGIN / (days * slots_per_day)))
+            room_capacities += [capacity] * (needed - len(room_capacities))
+        room_capacities.reverse()
+    else:
+        # Toutes les capacités sont représentées, les autres salles suivent la répartition
+        room_capacities = sorted(capacities) + _weighted(rnd, capacities, max(0, rooms - len(capacities)))
+        room_capacities = room_capacities[:rooms]
+    room_rows = [RoomRow(id=r_idx + 1, capacity=capacity) for r_idx, capacity in enumerate(room_capacities)]
+
+    proctor_rows = [
+        ProctorRow(id=p_idx + 1, department=rnd.choice(department_names), availability=None)
+        for p_idx in range(proctors)
+    ]
+
+    time_slot_rows = []
+    for day in range(days):
+        day_start = FIRST_DAY + timedelta(days=day, hours=DAY_START)
+        for position in range(slots_per_day):
+            start_time = day_start + timedelta(minutes=position * SLOT_MINUTES)
+            time_slot_rows.append(TimeSlotRow(
+                id=len(time_slot_rows) + 1, start_time=start_time, end_time=start_time + timedelta(minutes=SLOT_MINUTES)
+            ))
+
+    return ProblemInstance(exam_rows, room_rows, proctor_rows, time_slot_rows)
@@ -0,0 +1,173 @@
+from datetime import timedelta
+
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from .instance import ExamRow, ProblemInstance, TimeSlotRow
+from .models import Room, Proctor, Exam, TimeSlot
+from .services import instance_querysets
+from .views import ExamViewSet
+
+
+def create_exams(count):
+    """Examens placés dans une salle, avec deux surveillants et un créneau chacun"""
+    start = timezone.now().replace(hour=8, minute=0, second=0, microsecond=0)
+    proctors = [Proctor.objects.create(name=f"Surveillant {i}", department='Informatique') for i in range(2)]
+    for i in range(count):
+        room = Room.objects.create(name=f"Salle {i}", capacity=40, status='available')
+        exam = Exam.objects.create(
+            name=f"Examen {i}", date=start + timedelta(days=i), duration_minutes=120,
+            participants=30, level='L1', department='Informatique', room=room,
+        )
+        exam.proctors.set(proctors)
+        TimeSlot.objects.create(
+            room=room, exam=exam, start_time=exam.date, end_time=exam.date + timedelta(minutes=120),
+        )
+
+
+class ListQueryCountTests(TestCase):
+    """
+    Le nombre de requêtes des listes ne dépend pas du nombre de lignes (pas de
+    N+1) : chaque liste est mesurée avec deux tailles de données. La première
+    requête lit les versions des tables (ETag, voir versions.conditional).
+    """
+
+    def assert_list_queries(self, url, expected):
+        for count in (2, 12):
+            with self.subTest(rows=count):
+                Exam.objects.all().delete()
+                Room.objects.all().delete()
+                Proctor.objects.all().delete()
+                create_exams(count)
+                # Première requête du processus : récupération des jobs abandonnés (signals.py)
+                self.client.get(url)
+                with self.assertNumQueries(expected):
+                    response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                rows = response.json()
+                # Les listes DRF sont paginées
+                if isinstance(rows, dict):
+                    rows = rows['results']
+                self.assertEqual(len(rows), count)
+
+    def test_bridge_exams(self):
+        # Versions, examens avec leur salle (select_related), surveillants (prefetch_related)
+        self.assert_list_queries(reverse('get_exams'), 3)
+
+    def test_bridge_timeslots(self):
+        # Versions, créneaux (salle et examen lus par leur clé étrangère)
+        self.assert_list_queries(reverse('get_timeslots'), 2)
+
+    def test_exam_list(self):
+        # Versions, page d'examens avec leur salle, surveillants de la page
+        self.assert_list_queries(reverse('exam-list') + '?limit=100', 3)
+
+
+class IndexUsageTests(TestCase):
+    """
+    Les requêtes du chargement du solveur et les filtres de la liste des examens
+    passent par les index de la migration 0005 (plan lu avec QuerySet.explain()).
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        start = timezone.now().replace(hour=8, minute=0, second=0, microsecond=0)
+        room = Room.objects.create(name="Salle 1", capacity=40, status='available')
+        # Replanification après l'ajout de quelques examens : peu d'examens à placer,
+        # mais beaucoup de créneaux libres (générés pour toute la session)
+        exams = Exam.objects.bulk_create([
+            Exam(
+                name=f"Examen {i}", date=start + timedelta(hours=i), duration_minutes=120, participants=30,
+                level=['L1', 'L2', 'L3', 'M1', 'M2'][i % 5], department=f"Filière {i % 7}",
+                room=None if i % 10 == 0 else room,
+            )
+            for i in range(500)
+        ])
+        TimeSlot.objects.bulk_create([
+            TimeSlot(
+                room=room, exam=exams[i // 10] if i % 10 == 1 else None,
+                start_time=start + timedelta(minutes=30 * i), end_time=start + timedelta(minutes=30 * (i + 1)),
+            )
+            for i in range(2000)
+        ])
+
+    def setUp(self):
+        if not connection.features.supports_explaining_query_execution:
+            self.skipTest("EXPLAIN is not supported by this database backend")
+        # Statistiques à jour pour que le planificateur choisisse comme en production
+        tables = [Exam._meta.db_table, TimeSlot._meta.db_table]
+        with connection.cursor() as cursor:
+            if connection.vendor == 'sqlite':
+                cursor.execute('ANALYZE')
+            elif connection.vendor == 'mysql':
+                cursor.execute(f"ANALYZE TABLE {', '.join(tables)}")
+            else:
+                for table in tables:
+                    cursor.execute(f'ANALYZE {table}')
+            if connection.vendor == 'postgresql':
+                # Tables de test trop petites : le parcours séquentiel l'emporterait
+                # même quand l'index est le bon choix
+                cursor.execute('SET LOCAL enable_seqscan = off')
+
+    def assert_uses_index(self, queryset, *names):
+        plan = queryset.explain()
+        self.assertTrue(any(name in plan for name in names), f"None of {names} in plan:\n{plan}")
+
+    def fk_index(self, model, column):
+        """Nom de l'index créé par Django pour une clé étrangère"""
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, model._meta.db_table)
+        return next(
+            name for name, info in constraints.items()
+            if info['index'] and info['columns'] == [column] and not info['primary_key']
+        )
+
+    def exam_list_queryset(self, **params):
+        request = Request(APIRequestFactory().get('/', params))
+        return ExamViewSet(request=request, format_kwarg=None).get_queryset()
+
+    def test_solver_loader(self):
+        if not connection.features.supports_partial_indexes:
+            self.skipTest("Partial indexes are not supported by this database backend")
+        exams, _, _, time_slots = instance_querysets()
+        exam_indexes = ['exam_unscheduled']
+        time_slot_indexes = ['timeslot_free_start_time']
+        if connection.vendor == 'sqlite':
+            # Sans histogramme, SQLite estime `IS NULL` d'après le nombre moyen de lignes
+            # par valeur et préfère souvent l'index de la clé étrangère : un parcours
+            # d'index reste exigé, mais pas forcément celui de l'index partiel
+            exam_indexes.append(self.fk_index(Exam, 'room_id'))
+            time_slot_indexes.append(self.fk_index(TimeSlot, 'exam_id'))
+        self.assert_uses_index(exams, *exam_indexes)
+        self.assert_uses_index(time_slots, *time_slot_indexes)
+
+    def test_exam_list_filters(self):
+        day = (timezone.localtime(Exam.objects.order_by('date').first().date)).date().isoformat()
+        self.assert_uses_index(
+            self.exam_list_queryset(level='L1', department='Filière 1', date=day), 'exam_level_department_date'
+        )
+        self.assert_uses_index(self.exam_list_queryset(level='L1'), 'exam_level_department_date')
+        self.assert_uses_index(self.exam_list_queryset(department='Filière 1', date=day), 'exam_department_date')
+        self.assert_uses_index(self.exam_list_queryset(date=day), 'exam_date')
+
+
+class SlotSpanTests(SimpleTestCase):
+    """Créneaux occupés par un examen, d'après les heures des créneaux"""
+
+    def test_hourly_slots_with_break(self):
+        # Créneaux d'une heure, de 8h à 12h puis de 14h à 16h
+        day = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        time_slots = [
+            TimeSlotRow(t_idx, day + timedelta(hours=hour), day + timedelta(hours=hour + 1))
+            for t_idx, hour in enumerate((8, 9, 10, 11, 14, 15))
+        ]
+        exams = [ExamRow(1, 120, 'L1', 'Informatique', 30), ExamRow(2, 90, 'L2', 'Physique', 30)]
+        spans, rows = ProblemInstance(exams, [], [], time_slots).slot_spans()
+        # 2h : deux créneaux, sans déborder sur la pause ni après le dernier créneau
+        self.assertEqual(spans[rows[0]].tolist(), [2, 2, 2, 0, 2, 0])
+        # 1h30 : deux créneaux entamés
+        self.assertEqual(spans[rows[1]].tolist(), [2, 2, 2, 0, 2, 0])
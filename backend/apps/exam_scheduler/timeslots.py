@@ -0,0 +1,103 @@
+from datetime import datetime, time, timedelta
+
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
+
+from .models import TimeSlot
+from .stats import invalidate_stats
+from .versions import bump_versions
+
+# Journée type par défaut : créneaux de 30 minutes de 8h à 18h.
+# Une plage est (début, fin, pas en minutes[, durée d'un créneau en minutes]) ;
+# sans durée, les créneaux se suivent sans se chevaucher.
+DEFAULT_DAY_TEMPLATE = [('08:00', '18:00', 30)]
+# Nombre de créneaux insérés par requête
+BATCH_SIZE = 1000
+
+
+class TimeSlotConflictError(Exception):
+    """Des créneaux de la période ont été créés par une autre génération en parallèle"""
+
+
+def set_period_constraint(mode):
+    """
+    Mode de vérification de l'unicité salle/période (TimeSlot.Meta, différée par
+    défaut) pour la transaction en cours : 'IMMEDIATE' vérifie aussi les
+    écritures déjà faites. Sans effet si la base n'a pas de contrainte différée.
+    """
+    if connection.features.supports_deferrable_unique_constraints:
+        with connection.cursor() as cursor:
+            cursor.execute(f'SET CONSTRAINTS unique_timeslot_room_period {mode}')
+
+
+def parse_time(value):
+    """Convertir une heure "08:30" en objet time"""
+    hour, minute = map(int, value.split(':'))
+    return time(hour, minute)
+
+
+def day_template(templates, day):
+    """
+    Plages d'une journée. `templates` est soit une liste de plages valable
+    tous les jours, soit un dictionnaire {jour de la semaine (0 = lundi): plages} ;
+    les jours absents du dictionnaire n'ont pas de créneau.
+    """
+    if isinstance(templates, dict):
+        return templates.get(day.weekday(), templates.get(str(day.weekday()), []))
+    return templates
+
+
+def slot_periods(start_date, end_date, templates=None):
+    """(début, fin) de chaque créneau du start_date au end_date inclus, dans le fuseau courant"""
+    templates = DEFAULT_DAY_TEMPLATE if templates is None else templates
+    day = start_date
+    while day <= end_date:
+        for period in day_template(templates, day):
+            start, end, step = period[:3]
+            length = timedelta(minutes=int(period[3] if len(period) > 3 else step))
+            current = timezone.make_aware(datetime.combine(day, parse_time(start)))
+            last = timezone.make_aware(datetime.combine(day, parse_time(end)))
+            while current + length <= last:
+                yield current, current + length
+                current += timedelta(minutes=int(step))
+        day += timedelta(days=1)
+
+
+def generate_timeslots(start_date, end_date=None, templates=None, room=None, batch_size=BATCH_SIZE):
+    """
+    Créer les créneaux d'une période (date de début et de fin incluses) selon
+    une journée type. Les créneaux qui existent déjà pour la même salle et les
+    mêmes heures sont conservés : relancer la génération ne crée pas de doublon.
+    Lève TimeSlotConflictError si une génération concurrente a créé les mêmes
+    créneaux entre-temps. Retourne (créneaux créés, nombre de créneaux déjà existants).
+    """
+    periods = sorted(set(slot_periods(start_date, end_date or start_date, templates)))
+    if not periods:
+        return [], 0
+
+    try:
+        with transaction.atomic():
+            # Vérifier l'unicité dès l'insertion pour qu'un doublon créé par une génération
+            # concurrente lève l'erreur ici, même dans une transaction englobante
+            set_period_constraint('IMMEDIATE')
+            existing = set(
+                TimeSlot.objects.filter(
+                    room=room, start_time__gte=periods[0][0], start_time__lte=periods[-1][0]
+                ).values_list('start_time', 'end_time')
+            )
+            created = TimeSlot.objects.bulk_create(
+                [
+                    TimeSlot(room=room, start_time=start_time, end_time=end_time)
+                    for start_time, end_time in periods if (start_time, end_time) not in existing
+                ],
+                batch_size=batch_size,
+            )
+            set_period_constraint('DEFERRED')
+            # bulk_create n'envoie pas de signaux
+            invalidate_stats()
+            bump_versions(TimeSlot)
+    except IntegrityError as e:
+        raise TimeSlotConflictError(
+            'Time slots of this period were created concurrently; run the generation again'
+        ) from e
+    return created, len(periods) - len(created)
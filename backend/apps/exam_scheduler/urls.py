@@ -2,7 +2,9 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import (
     RoomViewSet, ProctorViewSet, ExamViewSet, 
-    TimeSlotViewSet, get_stats, schedule_exams, manual_schedule, generate_timeslots
+    TimeSlotViewSet, get_stats, schedule_exams, manual_schedule, generate_timeslots,
+    reassign_proctors, submit_schedule_job, schedule_job_status, schedule_job_result,
+    cancel_schedule_job, schedule_job_events
 )
 
 router = DefaultRouter()
@@ -15,6 +17,12 @@ urlpatterns = [
     path('', include(router.urls)),
     path('stats/', get_stats, name='get_stats'),
     path('schedule/', schedule_exams, name='schedule_exams'),
+    path('schedule/jobs/', submit_schedule_job, name='submit_schedule_job'),
+    path('schedule/jobs/<uuid:job_id>/', schedule_job_status, name='schedule_job_status'),
+    path('schedule/jobs/<uuid:job_id>/result/', schedule_job_result, name='schedule_job_result'),
+    path('schedule/jobs/<uuid:job_id>/events/', schedule_job_events, name='schedule_job_events'),
+    path('schedule/jobs/<uuid:job_id>/cancel/', cancel_schedule_job, name='cancel_schedule_job'),
     path('manual-schedule/', manual_schedule, name='manual_schedule'),
+    path('assign-proctors/', reassign_proctors, name='reassign_proctors'),
     path('generate-timeslots/', generate_timeslots, name='generate_timeslots'),
 ]
\ No newline at end of file
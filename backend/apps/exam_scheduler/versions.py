@@ -0,0 +1,61 @@
+import hashlib
+
+from django.db.models import F
+from django.utils import timezone
+from django.views.decorators.http import condition
+
+from .models import ModelVersion
+
+
+def bump_versions(*models):
+    """
+    Incrémenter le compteur de modifications des tables des modèles donnés, dans
+    la transaction en cours. À appeler après les écritures qui n'envoient pas de
+    signaux (update, bulk_update, bulk_create) ; les autres passent par signals.py.
+    """
+    labels = {model._meta.label_lower for model in models}
+    now = timezone.now()
+    updated = ModelVersion.objects.filter(label__in=labels).update(version=F('version') + 1, updated_at=now)
+    if updated < len(labels):
+        existing = set(ModelVersion.objects.filter(label__in=labels).values_list('label', flat=True))
+        ModelVersion.objects.bulk_create(
+            [ModelVersion(label=label, version=1, updated_at=now) for label in labels - existing],
+            ignore_conflicts=True,
+        )
+
+
+def current_versions(request, models):
+    """
+    Versions {label: (version, updated_at)} des tables des modèles, lues en une
+    requête et mémorisées sur la requête (ETag et Last-Modified les partagent).
+    """
+    labels = sorted(model._meta.label_lower for model in models)
+    cache = request.__dict__.setdefault('_model_versions', {})
+    key = tuple(labels)
+    if key not in cache:
+        rows = {
+            label: (version, updated_at)
+            for label, version, updated_at in ModelVersion.objects.filter(label__in=labels).values_list(
+                'label', 'version', 'updated_at'
+            )
+        }
+        cache[key] = {label: rows.get(label, (0, None)) for label in labels}
+    return cache[key]
+
+
+def conditional(*models):
+    """
+    Décorateur de vue GET : ETag et Last-Modified calculés à partir des versions
+    des tables lues par la vue, réponse 304 si le client a déjà cette version,
+    sans exécuter la vue. L'ETag dépend aussi de l'URL complète (filtres, pages).
+    """
+    def etag(request, *args, **kwargs):
+        versions = current_versions(request, models)
+        key = ';'.join(f'{label}={version}' for label, (version, _) in versions.items())
+        return hashlib.md5(f'{key}|{request.get_full_path()}'.encode()).hexdigest()
+
+    def last_modified(request, *args, **kwargs):
+        stamps = [updated_at for _, updated_at in current_versions(request, models).values() if updated_at]
+        return max(stamps) if stamps else None
+
+    return condition(etag_func=etag, last_modified_func=last_modified)
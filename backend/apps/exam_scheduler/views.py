@@ -1,26 +1,48 @@
+import json
+
 from rest_framework import viewsets, status
 from rest_framework.decorators import api_view, action
 from rest_framework.response import Response
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections, transaction
 from django.db.models import Q
+from django.http import StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import require_GET
 from django.utils import timezone
-from datetime import datetime
+from datetime import date, datetime, time, timedelta
 
-from .models import Room, Proctor, Exam, TimeSlot
+from . import jobs, stats, timeslots
+from .models import Room, Proctor, Exam, TimeSlot, ScheduleJob, CachedSolution
+from .pagination import StreamingListMixin
 from .serializers import (
     RoomSerializer, ProctorSerializer, ExamSerializer, 
-    TimeSlotSerializer, ExamDetailSerializer
+    TimeSlotSerializer, ExamDetailSerializer, ScheduleJobSerializer
+)
+from .proctoring import assign_proctors
+from .services import (
+    MissingDataError, ScheduleConflictError, build_scheduler, parse_options, replace_proctors, save_schedule,
+    solve_schedule,
 )
-from .optimizer import ExamScheduler
+from .stats import invalidate_stats
+from .versions import bump_versions, conditional
 
-class RoomViewSet(viewsets.ModelViewSet):
+@method_decorator(conditional(Room), name='list')
+@method_decorator(conditional(Room), name='retrieve')
+class RoomViewSet(StreamingListMixin, viewsets.ModelViewSet):
     queryset = Room.objects.all()
     serializer_class = RoomSerializer
 
-class ProctorViewSet(viewsets.ModelViewSet):
+@method_decorator(conditional(Proctor), name='list')
+@method_decorator(conditional(Proctor), name='retrieve')
+class ProctorViewSet(StreamingListMixin, viewsets.ModelViewSet):
     queryset = Proctor.objects.all()
     serializer_class = ProctorSerializer
 
-class ExamViewSet(viewsets.ModelViewSet):
+@method_decorator(conditional(Exam, Room, Proctor), name='list')
+@method_decorator(conditional(Exam, Room, Proctor), name='retrieve')
+class ExamViewSet(StreamingListMixin, viewsets.ModelViewSet):
     queryset = Exam.objects.all()
     serializer_class = ExamSerializer
 
@@ -30,7 +52,8 @@ class ExamViewSet(viewsets.ModelViewSet):
         return self.serializer_class
 
     def get_queryset(self):
-        queryset = Exam.objects.all()
+        # Salle et surveillants chargés en une requête chacun, quel que soit le nombre d'examens
+        queryset = Exam.objects.select_related('room').prefetch_related('proctors')
         level = self.request.query_params.get('level')
         department = self.request.query_params.get('department')
         date = self.request.query_params.get('date')
@@ -42,126 +65,160 @@ class ExamViewSet(viewsets.ModelViewSet):
         if date:
             try:
                 search_date = datetime.strptime(date, '%Y-%m-%d').date()
-                queryset = queryset.filter(date__date=search_date)
+                # Intervalle [début du jour, lendemain) plutôt que date__date, qui
+                # applique une fonction à la colonne et empêche d'utiliser l'index
+                day_start = timezone.make_aware(datetime.combine(search_date, time.min))
+                queryset = queryset.filter(date__gte=day_start, date__lt=day_start + timedelta(days=1))
             except ValueError:
                 pass
                 
         return queryset
 
-class TimeSlotViewSet(viewsets.ModelViewSet):
+@method_decorator(conditional(TimeSlot), name='list')
+@method_decorator(conditional(TimeSlot), name='retrieve')
+class TimeSlotViewSet(StreamingListMixin, viewsets.ModelViewSet):
     queryset = TimeSlot.objects.all()
     serializer_class = TimeSlotSerializer
     
-    def list(self, request, *args, **kwargs):
-        # Importer ici pour éviter les imports circulaires
-        from .fixtures import create_default_timeslots
-        
-        # Créer des créneaux par défaut si aucun n'existe
-        if TimeSlot.objects.count() == 0:
-            create_default_timeslots()
-            
-        return super().list(request, *args, **kwargs)
 
+@conditional(Room, Proctor, Exam, TimeSlot, CachedSolution)
 @api_view(['GET'])
 def get_stats(request):
-    total_exams = Exam.objects.count()
-    total_rooms = Room.objects.count()
-    total_proctors = Proctor.objects.count()
-    
-    # Calculer le taux d'occupation des salles
-    room_occupation = 0
-    if total_rooms > 0:
-        rooms_with_exams = Room.objects.filter(exam__isnull=False).distinct().count()
-        room_occupation = (rooms_with_exams / total_rooms) * 100
-    
-    # Répartition des surveillants
-    proctor_distribution = 0
-    if total_proctors > 0:
-        avg_proctors_per_exam = Exam.objects.filter(proctors__isnull=False).count() / total_proctors
-        proctor_distribution = avg_proctors_per_exam * 100
-    
-    # Répartition par département
-    departments = Exam.objects.values('department').distinct()
-    exams_by_department = []
-    
-    for dept in departments:
-        dept_name = dept['department']
-        count = Exam.objects.filter(department=dept_name).count()
-        percentage = (count / total_exams) * 100 if total_exams > 0 else 0
-        
-        exams_by_department.append({
-            'department': dept_name,
-            'count': count,
-            'percentage': round(percentage, 1)
-        })
-    
-    # Équilibrage des créneaux
-    time_slot_balance = 0
-    if TimeSlot.objects.count() > 0:
-        # Calculer l'équilibre en fonction de la répartition des examens par créneau
-        slots_with_exams = TimeSlot.objects.filter(exam__isnull=False).count()
-        time_slot_balance = (slots_with_exams / TimeSlot.objects.count()) * 100
-    
-    return Response({
-        'totalExams': total_exams,
-        'totalRooms': total_rooms,
-        'totalProctors': total_proctors,
-        'roomOccupation': round(room_occupation, 1),
-        'proctorDistribution': round(proctor_distribution, 1),
-        'timeSlotBalance': round(time_slot_balance, 1),
-        'examsByDepartment': exams_by_department
-    })
+    return Response(stats.get_stats())
 
 @api_view(['POST'])
 def schedule_exams(request):
-    exams = Exam.objects.filter(room__isnull=True)
-    rooms = Room.objects.all()
-    proctors = Proctor.objects.all()
-    time_slots = TimeSlot.objects.filter(exam__isnull=True)
-    
-    if not exams or not rooms or not proctors or not time_slots:
+    try:
+        options = parse_options(request.data)
+        scheduler = build_scheduler(options)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    except MissingDataError:
         return Response(
             {'error': 'Missing data for scheduling'},
             status=status.HTTP_400_BAD_REQUEST
         )
     
-    scheduler = ExamScheduler(exams, rooms, proctors, time_slots)
-    result = scheduler.create_schedule()
+    result = solve_schedule(scheduler, options)
     
     if result['status'] == 'success':
-        # Mettre à jour la base de données avec les résultats
-        for item in result['results']:
-            exam = Exam.objects.get(id=item['exam_id'])
-            room = Room.objects.get(id=item['room_id'])
-            time_slot = TimeSlot.objects.get(id=item['time_slot_id'])
-            
-            # Mettre à jour l'examen
-            exam.room = room
-            exam.save()
-            
-            # Ajouter les surveillants
-            exam.proctors.clear()
-            for proctor_id in item['proctor_ids']:
-                proctor = Proctor.objects.get(id=proctor_id)
-                exam.proctors.add(proctor)
-            
-            # Mettre à jour le créneau
-            time_slot.exam = exam
-            time_slot.start_time = item['start_time']
-            time_slot.end_time = item['end_time']
-            time_slot.room = room
-            time_slot.save()
-            
-            # Mettre à jour le statut de la salle
-            room.status = 'occupied'
-            room.save()
-        
-        return Response({'status': 'success', 'scheduled_exams': len(result['results'])})
+        try:
+            save_schedule(result, warm_start=options['warm_start'], versions=scheduler.input_versions)
+        except ScheduleConflictError:
+            return Response(
+                {'status': 'failure', 'message': 'Exams, rooms, proctors or time slots changed while solving'},
+                status=status.HTTP_409_CONFLICT
+            )
+        response = {
+            'status': 'success',
+            'scheduled_exams': len(result['results']),
+            'presolve': result['presolve'],
+            'report': result['report'],
+        }
+        if 'lns' in result:
+            response['lns'] = result['lns']
+        if result.get('cached'):
+            response['cached'] = True
+        return Response(response)
     else:
         return Response(
-            {'status': 'failure', 'message': 'No feasible schedule found'},
+            {'status': 'failure', 'message': 'No feasible schedule found', 'report': result['report']},
             status=status.HTTP_400_BAD_REQUEST
         )
+
+@api_view(['POST'])
+def submit_schedule_job(request):
+    """Lancer une planification en arrière-plan et retourner immédiatement l'identifiant du job."""
+    try:
+        options = parse_options(request.data)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    job = jobs.submit_job(options)
+    return Response(ScheduleJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+@conditional(ScheduleJob)
+@api_view(['GET'])
+def schedule_job_status(request, job_id):
+    job = get_object_or_404(ScheduleJob, id=job_id)
+    return Response(ScheduleJobSerializer(job).data)
+
+@conditional(ScheduleJob)
+@api_view(['GET'])
+def schedule_job_result(request, job_id):
+    job = get_object_or_404(ScheduleJob, id=job_id)
+    if not job.is_finished:
+        return Response(ScheduleJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+    return Response({'id': job.id, 'status': job.status, 'result': job.result, 'error': job.error})
+
+@require_GET
+def schedule_job_events(request, job_id):
+    """
+    Suivre un job en Server-Sent Events : chaque solution améliorante trouvée
+    ('solution'), puis l'état final ('result'). Lecture seule : le job est lancé
+    par POST schedule/jobs/.
+    """
+    get_object_or_404(ScheduleJob, id=job_id)
+
+    def stream():
+        try:
+            for name, data in jobs.follow_job(job_id):
+                yield f"event: {name}\ndata: {json.dumps(data, cls=DjangoJSONEncoder)}\n\n"
+        finally:
+            close_old_connections()
+
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+@api_view(['POST'])
+def cancel_schedule_job(request, job_id):
+    job = get_object_or_404(ScheduleJob, id=job_id)
+    if job.is_finished:
+        return Response(
+            {'status': 'failure', 'message': f'Job already {job.status}'},
+            status=status.HTTP_409_CONFLICT
+        )
+    jobs.cancel_job(job)
+    return Response(ScheduleJobSerializer(job).data)
+
+@api_view(['POST'])
+def reassign_proctors(request):
+    """Réaffecter les surveillants sur l'emploi du temps existant, sans le recalculer."""
+    time_slots = TimeSlot.objects.filter(exam__isnull=False).select_related('exam').order_by('start_time', 'id')
+    proctors = list(Proctor.objects.all())
+
+    # Un examen peut occuper plusieurs créneaux : une seule période par examen, qui les couvre tous
+    periods = {}
+    exams = {}
+    for slot in time_slots:
+        exams.setdefault(slot.exam_id, slot.exam)
+        start_time, end_time = periods.get(slot.exam_id, (slot.start_time, slot.end_time))
+        periods[slot.exam_id] = (min(start_time, slot.start_time), max(end_time, slot.end_time))
+    results = [
+        {'exam_id': exam_id, 'start_time': start_time, 'end_time': end_time}
+        for exam_id, (start_time, end_time) in periods.items()
+    ]
+
+    if not results or not proctors:
+        return Response(
+            {'error': 'Missing data for proctor assignment'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    assignment, understaffed = assign_proctors(results, list(exams.values()), proctors)
+    with transaction.atomic():
+        replace_proctors(assignment)
+    # Les écritures en masse n'envoient pas de signaux
+    invalidate_stats()
+    bump_versions(Exam)
+
+    return Response({
+        'status': 'success' if not understaffed else 'partial',
+        'assigned_exams': len(results) - len(understaffed),
+        'understaffed_exam_ids': understaffed
+    })
         
 @api_view(['POST'])
 def manual_schedule(request):
@@ -209,48 +266,39 @@ def manual_schedule(request):
 
 @api_view(['POST'])
 def generate_timeslots(request):
-    """Générer des créneaux horaires pour les examens."""
-    start_time_str = request.data.get('start_time', '08:00')
-    end_time_str = request.data.get('end_time', '18:00')
-    interval_minutes = int(request.data.get('interval_minutes', 30))
-    
+    """
+    Générer des créneaux horaires pour les examens, du start_date au end_date
+    (par défaut aujourd'hui), selon une journée type : soit start_time, end_time
+    et interval_minutes, soit templates (plages par jour de la semaine, voir
+    timeslots.day_template). Les créneaux existants ne sont pas dupliqués.
+    """
     try:
-        # Obtenir la date actuelle
-        today = timezone.now().date()
-        
-        # Créer les heures de début et de fin
-        start_hour, start_minute = map(int, start_time_str.split(':'))
-        end_hour, end_minute = map(int, end_time_str.split(':'))
-        
-        start_time = timezone.datetime.combine(today, timezone.datetime.min.time().replace(hour=start_hour, minute=start_minute))
-        end_time = timezone.datetime.combine(today, timezone.datetime.min.time().replace(hour=end_hour, minute=end_minute))
-        
-        # Générer les créneaux
-        current_time = start_time
-        created_slots = []
-        
-        while current_time < end_time:
-            next_time = current_time + timedelta(minutes=interval_minutes)
-            
-            # Créer un créneau horaire
-            time_slot = TimeSlot.objects.create(
-                start_time=current_time,
-                end_time=next_time
-            )
-            
-            created_slots.append({
-                'id': time_slot.id,
-                'start_time': time_slot.start_time,
-                'end_time': time_slot.end_time
-            })
-            
-            current_time = next_time
-        
+        start_date = request.data.get('start_date')
+        start_date = date.fromisoformat(start_date) if start_date else timezone.localdate()
+        end_date = request.data.get('end_date')
+        end_date = date.fromisoformat(end_date) if end_date else start_date
+        templates = request.data.get('templates') or [(
+            request.data.get('start_time', '08:00'),
+            request.data.get('end_time', '18:00'),
+            int(request.data.get('interval_minutes', 30)),
+        )]
+
+        created, existing = timeslots.generate_timeslots(start_date, end_date, templates)
+        created_slots = [
+            {'id': time_slot.id, 'start_time': time_slot.start_time, 'end_time': time_slot.end_time}
+            for time_slot in created
+        ]
         return Response({
             'status': 'success',
             'message': f'Créé {len(created_slots)} créneaux horaires',
+            'existing': existing,
             'time_slots': created_slots
         })
+    except timeslots.TimeSlotConflictError as e:
+        return Response(
+            {'status': 'failure', 'message': str(e)},
+            status=status.HTTP_409_CONFLICT
+        )
     except Exception as e:
         return Response(
             {'status': 'failure', 'message': str(e)},
@@ -4,7 +4,12 @@ from datetime import datetime
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
-from .apps.exam_scheduler.models import Room, Proctor, Exam, TimeSlot
+from .apps.exam_scheduler import stats
+from .apps.exam_scheduler.models import Room, Proctor, Exam, TimeSlot, CachedSolution
+from .apps.exam_scheduler.pagination import (
+    STREAM_CHUNK_SIZE, keyset_page, parse_keyset_params, streaming_json_response, wants_stream
+)
+from .apps.exam_scheduler.versions import conditional
 
 def json_serial(obj):
     """Convertir les objets spéciaux en JSON"""
@@ -13,29 +18,11 @@ def json_serial(obj):
     raise TypeError(f"Type {type(obj)} not serializable")
 
 def convert_exam_to_frontend(exam):
-    """Convertir un objet Exam Django vers le format attendu par le frontend"""
-    proctors = list(exam.proctors.all())
-    proctors_data = [
-        {
-            'id': p.id,
-            'name': p.name,
-            'department': p.department,
-            'availability': p.availability,
-            'avatarUrl': p.avatar_url
-        }
-        for p in proctors
-    ]
-    
-    room_data = None
-    if exam.room:
-        room_data = {
-            'id': exam.room.id,
-            'name': exam.room.name,
-            'capacity': exam.room.capacity,
-            'occupancyRate': exam.room.occupancy_rate,
-            'status': exam.room.status
-        }
-    
+    """
+    Convertir un objet Exam Django vers le format attendu par le frontend.
+    Charger la salle et les surveillants avec select_related('room') et
+    prefetch_related('proctors') pour éviter des requêtes par examen.
+    """
     return {
         'id': exam.id,
         'name': exam.name,
@@ -44,8 +31,8 @@ def convert_exam_to_frontend(exam):
         'date': exam.date,
         'duration': exam.duration,
         'participants': exam.participants,
-        'room': room_data,
-        'proctors': proctors_data
+        'room': convert_room_to_frontend(exam.room) if exam.room else None,
+        'proctors': [convert_proctor_to_frontend(proctor) for proctor in exam.proctors.all()]
     }
 
 def convert_room_to_frontend(room):
@@ -74,86 +61,61 @@ def convert_timeslot_to_frontend(timeslot):
         'id': timeslot.id,
         'startTime': timeslot.start_time,
         'endTime': timeslot.end_time,
-        'roomId': timeslot.room.id if timeslot.room else None,
-        'examId': timeslot.exam.id if timeslot.exam else None
+        # Clés étrangères lues directement, sans charger la salle ni l'examen
+        'roomId': timeslot.room_id,
+        'examId': timeslot.exam_id
     }
 
+def list_response(request, queryset, convert):
+    """
+    Réponse d'une liste :
+    - ?stream=1 : liste complète écrite au fil de l'eau, le queryset étant lu par blocs ;
+    - ?cursor=<id>&limit=<n> : une page, le curseur suivant dans l'en-tête X-Next-Cursor ;
+    - sinon la liste complète.
+    """
+    if wants_stream(request):
+        rows = (convert(obj) for obj in queryset.iterator(chunk_size=STREAM_CHUNK_SIZE))
+        return streaming_json_response(rows, default=json_serial)
+
+    try:
+        cursor, limit = parse_keyset_params(request.GET)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    next_cursor = None
+    if limit is None:
+        objects = queryset
+    else:
+        objects, next_cursor = keyset_page(queryset, cursor, limit)
+    response = JsonResponse([convert(obj) for obj in objects], safe=False, json_dumps_params={'default': json_serial})
+    if next_cursor is not None:
+        response['X-Next-Cursor'] = str(next_cursor)
+    return response
+
 # API Routes
 
 @require_http_methods(["GET"])
+@conditional(Room)
 def get_rooms(request):
-    rooms = Room.objects.all()
-    room_data = [convert_room_to_frontend(room) for room in rooms]
-    return JsonResponse(room_data, safe=False, json_dumps_params={'default': json_serial})
+    return list_response(request, Room.objects.all(), convert_room_to_frontend)
 
 @require_http_methods(["GET"])
+@conditional(Proctor)
 def get_proctors(request):
-    proctors = Proctor.objects.all()
-    proctor_data = [convert_proctor_to_frontend(proctor) for proctor in proctors]
-    return JsonResponse(proctor_data, safe=False, json_dumps_params={'default': json_serial})
+    return list_response(request, Proctor.objects.all(), convert_proctor_to_frontend)
 
 @require_http_methods(["GET"])
+@conditional(Exam, Room, Proctor)
 def get_exams(request):
-    exams = Exam.objects.all()
-    exam_data = [convert_exam_to_frontend(exam) for exam in exams]
-    return JsonResponse(exam_data, safe=False, json_dumps_params={'default': json_serial})
+    exams = Exam.objects.select_related('room').prefetch_related('proctors')
+    return list_response(request, exams, convert_exam_to_frontend)
 
 @require_http_methods(["GET"])
+@conditional(TimeSlot)
 def get_timeslots(request):
-    timeslots = TimeSlot.objects.all()
-    timeslot_data = [convert_timeslot_to_frontend(timeslot) for timeslot in timeslots]
-    return JsonResponse(timeslot_data, safe=False, json_dumps_params={'default': json_serial})
+    return list_response(request, TimeSlot.objects.all(), convert_timeslot_to_frontend)
 
 @require_http_methods(["GET"])
+@conditional(Room, Proctor, Exam, TimeSlot, CachedSolution)
 def get_stats(request):
-    # Calculer les statistiques
-    total_exams = Exam.objects.count()
-    total_rooms = Room.objects.count()
-    total_proctors = Proctor.objects.count()
-    
-    # Taux d'occupation des salles
-    room_occupation = 0
-    if total_rooms > 0:
-        rooms_with_exams = Room.objects.filter(exam__isnull=False).distinct().count()
-        room_occupation = (rooms_with_exams / total_rooms) * 100
-    
-    # Répartition des surveillants
-    proctor_distribution = 0
-    if total_proctors > 0:
-        assigned_proctors = Proctor.objects.filter(exam__isnull=False).distinct().count()
-        proctor_distribution = (assigned_proctors / total_proctors) * 100
-    
-    # Équilibrage des créneaux
-    time_slot_balance = 0
-    if TimeSlot.objects.count() > 0:
-        slots_with_exams = TimeSlot.objects.filter(exam__isnull=False).count()
-        time_slot_balance = (slots_with_exams / TimeSlot.objects.count()) * 100
-    
-    # Répartition par département
-    departments = {}
-    for exam in Exam.objects.all():
-        if exam.department in departments:
-            departments[exam.department] += 1
-        else:
-            departments[exam.department] = 1
-    
-    exams_by_department = []
-    for dept, count in departments.items():
-        percentage = (count / total_exams) * 100 if total_exams > 0 else 0
-        exams_by_department.append({
-            'department': dept,
-            'count': count,
-            'percentage': round(percentage, 1)
-        })
-    
-    stats = {
-        'totalExams': total_exams,
-        'totalRooms': total_rooms,
-        'totalProctors': total_proctors,
-        'roomOccupation': round(room_occupation, 1),
-        'proctorDistribution': round(proctor_distribution, 1),
-        'timeSlotBalance': round(time_slot_balance, 1),
-        'examsByDepartment': exams_by_department
-    }
-    
-    return JsonResponse(stats, json_dumps_params={'default': json_serial})
\ No newline at end of file
+    return JsonResponse(stats.get_stats(), json_dumps_params={'default': json_serial})
@@ -1,6 +1,7 @@
 from django.contrib import admin
 from django.urls import path, include
 from backend import bridge_api
+from backend.apps.exam_scheduler import metrics
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -11,4 +12,6 @@ urlpatterns = [
     path('api/exams', bridge_api.get_exams, name='get_exams'),
     path('api/time-slots', bridge_api.get_timeslots, name='get_timeslots'),
     path('api/stats', bridge_api.get_stats, name='get_stats'),
+    # Métriques au format Prometheus
+    path('metrics', metrics.metrics_view, name='metrics'),
 ]
\ No newline at end of file
@@ -29,6 +29,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # En premier, pour mesurer toute la chaîne de traitement
+    'backend.apps.exam_scheduler.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -109,12 +111,22 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # CORS settings
 CORS_ALLOW_ALL_ORIGINS = True
 CORS_ALLOW_CREDENTIALS = True
+CORS_EXPOSE_HEADERS = ['X-Next-Cursor']
 
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'backend.apps.exam_scheduler.pagination.IdCursorPagination',
     'PAGE_SIZE': 100,
-}
\ No newline at end of file
+}
+
+# Planification en arrière-plan : nombre de résolutions simultanées
+SCHEDULER_JOB_WORKERS = int(os.environ.get('SCHEDULER_JOB_WORKERS', 2))
+# Intervalle de surveillance des jobs (annulation, signe de vie) et délai sans signe
+# de vie au-delà duquel un job est considéré abandonné par un processus arrêté
+SCHEDULER_JOB_POLL_SECONDS = float(os.environ.get('SCHEDULER_JOB_POLL_SECONDS', 2))
+SCHEDULER_JOB_STALE_SECONDS = float(os.environ.get('SCHEDULER_JOB_STALE_SECONDS', 60))
+# Cache des emplois du temps calculés : nombre maximal d'entrées conservées
+SOLUTION_CACHE_SIZE = int(os.environ.get('SOLUTION_CACHE_SIZE', 50))
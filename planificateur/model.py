@@ -1,15 +1,23 @@
-from datetime import datetime
+from datetime import datetime, timedelta
+
+def duration_in_minutes(duration):
+    """Convertir une durée ("2h30", "1h", "90") en minutes"""
+    hours, separator, minutes = str(duration).strip().lower().partition('h')
+    if not separator:
+        return int(hours)
+    return int(hours) * 60 + (int(minutes) if minutes else 0)
 
 class Exam:
     def __init__(self, exam_id, duration, level, department):
         self.id = exam_id
-        self.duration = duration  # Format "h:m" (par exemple "2h30")
+        self.duration = duration  # Format "h:m" (par exemple "2h30", "1h")
         self.level = level  # Ex: "L3", "M1", etc.
         self.department = department  # Ex: "Informatique"
+        # Durée convertie une seule fois, une durée invalide est refusée dès la création
+        self.duration_minutes = duration_in_minutes(duration)
     
     def get_duration_in_minutes(self):
-        hours, minutes = map(int, self.duration.split('h'))
-        return hours * 60 + minutes
+        return self.duration_minutes
 
 class Room:
     def __init__(self, room_id, capacity):
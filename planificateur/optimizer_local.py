@@ -1,132 +1,243 @@
-from ortools.sat.python import cp_model
+import heapq
+from bisect import bisect_left
 from datetime import timedelta
 
+from model import duration_in_minutes
+
+# Nombre de surveillants affectés à chaque examen
+PROCTORS_PER_EXAM = 2
+
+
 class ExamScheduler:
+    """
+    Heuristique constructive rapide (sans solveur) :
+    - coloration de type DSatur du graphe des conflits promotion/filière :
+      l'examen suivant est pris dans la classe (promotion, filière) dont les
+      créneaux interdits sont les plus nombreux ;
+    - au sein d'une classe, les examens les plus longs et les plus gros d'abord ;
+    - salle choisie au plus juste dans un index trié par capacité ;
+    - surveillants affectés à tour de rôle.
+    Les occupations sont des masques de bits sur les créneaux triés.
+    """
+
     def __init__(self, exams, rooms, proctors, time_slots):
         self.exams = exams
         self.rooms = rooms
         self.proctors = proctors
         self.time_slots = time_slots
-        self.model = cp_model.CpModel()
-        self.solver = cp_model.CpSolver()
 
     def create_schedule(self):
-        # Variables de décision
-        X = {}  # X[e, r, t] = 1 si l'examen e est dans la salle r au créneau t
-        Y = {}  # Y[e, p] = 1 si l'examen e est surveillé par le surveillant p
-
-        # Initialisation des variables
-        for e_idx, exam in enumerate(self.exams):
-            for r_idx, room in enumerate(self.rooms):
-                for t_idx, time_slot in enumerate(self.time_slots):
-                    X[e_idx, r_idx, t_idx] = self.model.NewBoolVar(f'X_{e_idx}_{r_idx}_{t_idx}')
-
-        for e_idx, exam in enumerate(self.exams):
-            for p_idx, proctor in enumerate(self.proctors):
-                Y[e_idx, p_idx] = self.model.NewBoolVar(f'Y_{e_idx}_{p_idx}')
-
-        # 1. Chaque examen doit être affecté à une seule salle et un seul créneau
-        for e_idx, exam in enumerate(self.exams):
-            self.model.Add(sum(X[e_idx, r_idx, t_idx] for r_idx in range(len(self.rooms)) 
-                              for t_idx in range(len(self.time_slots))) == 1)
-
-        # 2. Respect de la durée des examens
+        self.slots = sorted(self.time_slots, key=lambda time_slot: time_slot.start_time)
+        self.durations = [duration_in_minutes(exam.duration) for exam in self.exams]
+        self.day_ends = self._day_ends()
+        self._placements_cache = {}
+
+        # Index des salles trié par capacité
+        self.room_order = sorted(range(len(self.rooms)), key=lambda r_idx: self.rooms[r_idx].capacity)
+        self.capacities = [self.rooms[r_idx].capacity for r_idx in self.room_order]
+        # Salles libres à chaque créneau : masque de bits sur les positions de room_order
+        self.free_rooms = [(1 << len(self.rooms)) - 1] * len(self.slots)
+        # Surveillants libres à chaque créneau : masque de bits sur les surveillants
+        self.free_proctors = [(1 << len(self.proctors)) - 1] * len(self.slots)
+        self.next_proctor = 0
+
+        # Créneaux occupés par chaque promotion et chaque filière
+        level_busy = {}
+        department_busy = {}
+
+        # Classes d'examens de même promotion et même filière : elles ont la même
+        # saturation, ce qui rend la sélection DSatur indépendante du nombre d'examens
+        class_index = {}
+        members = []
         for e_idx, exam in enumerate(self.exams):
-            # Conversion de la durée (ex: "2h30") en nombre de créneaux
-            duration_parts = exam.duration.split('h')
-            hours = int(duration_parts[0])
-            minutes = int(duration_parts[1]) if len(duration_parts) > 1 and duration_parts[1] else 0
-            total_minutes = hours * 60 + minutes
-
-            # Calculer le nombre de créneaux nécessaires (en supposant des créneaux de 30 min)
-            required_slots = (total_minutes + 29) // 30  # Arrondi au supérieur
-
-            for r_idx in range(len(self.rooms)):
-                for t_idx in range(len(self.time_slots) - required_slots + 1):
-                    # Si l'examen commence à t_idx, il doit occuper les créneaux jusqu'à t_idx + required_slots
-                    for dt in range(1, required_slots):
-                        # Si X[e_idx, r_idx, t_idx] = 1, alors X[e_idx, r_idx, t_idx + dt] doit être 1
-                        self.model.Add(X[e_idx, r_idx, t_idx + dt] >= X[e_idx, r_idx, t_idx])
-
-        # 3. Une salle ne peut pas accueillir plus d'un examen en même temps
-        for r_idx in range(len(self.rooms)):
-            for t_idx in range(len(self.time_slots)):
-                self.model.Add(sum(X[e_idx, r_idx, t_idx] for e_idx in range(len(self.exams))) <= 1)
-
-        # 4. Un surveillant ne peut surveiller qu'un seul examen à la fois
-        for p_idx in range(len(self.proctors)):
-            for t_idx in range(len(self.time_slots)):
-                exams_at_slot = []
-                for e_idx in range(len(self.exams)):
-                    for r_idx in range(len(self.rooms)):
-                        if self.solver.Value(X[e_idx, r_idx, t_idx]) == 1:
-                            exams_at_slot.append(e_idx)
-                if exams_at_slot:
-                    self.model.Add(sum(Y[e_idx, p_idx] for e_idx in exams_at_slot) <= 1)
-
-        # 5. Un examen doit être surveillé par au moins un surveillant
-        for e_idx in range(len(self.exams)):
-            self.model.Add(sum(Y[e_idx, p_idx] for p_idx in range(len(self.proctors))) >= 1)
-
-        # 6. Les examens d'une même promotion ne peuvent pas être au même créneau
-        for e1_idx in range(len(self.exams)):
-            for e2_idx in range(e1_idx + 1, len(self.exams)):
-                if self.exams[e1_idx].level == self.exams[e2_idx].level:
-                    for t_idx in range(len(self.time_slots)):
-                        # Si les deux examens sont programmés au même créneau
-                        self.model.Add(
-                            sum(X[e1_idx, r_idx, t_idx] for r_idx in range(len(self.rooms))) +
-                            sum(X[e2_idx, r_idx, t_idx] for r_idx in range(len(self.rooms))) <= 1
-                        )
-
-        # 7. Une filière ne peut pas avoir deux examens en même temps (même promotions différentes)
-        for e1_idx in range(len(self.exams)):
-            for e2_idx in range(e1_idx + 1, len(self.exams)):
-                if self.exams[e1_idx].department == self.exams[e2_idx].department:
-                    for t_idx in range(len(self.time_slots)):
-                        self.model.Add(
-                            sum(X[e1_idx, r_idx, t_idx] for r_idx in range(len(self.rooms))) +
-                            sum(X[e2_idx, r_idx, t_idx] for r_idx in range(len(self.rooms))) <= 1
-                        )
-
-        # Fonction Objective : Minimiser le nombre de créneaux utilisés et équilibrer la charge
-        self.model.Minimize(
-            sum(t_idx * self.solver.Value(X[e_idx, r_idx, t_idx]) 
-                for e_idx in range(len(self.exams)) 
-                for r_idx in range(len(self.rooms)) 
-                for t_idx in range(len(self.time_slots)))
-        )
-
-        # Résolution
-        status = self.solver.Solve(self.model)
-
-        # Traitement des résultats
-        if status == cp_model.OPTIMAL or status == cp_model.FEASIBLE:
-            results = []
-            for e_idx, exam in enumerate(self.exams):
-                for r_idx, room in enumerate(self.rooms):
-                    for t_idx, time_slot in enumerate(self.time_slots):
-                        if self.solver.Value(X[e_idx, r_idx, t_idx]) == 1:
-                            # Trouver les surveillants assignés à cet examen
-                            assigned_proctors = []
-                            for p_idx, proctor in enumerate(self.proctors):
-                                if self.solver.Value(Y[e_idx, p_idx]) == 1:
-                                    assigned_proctors.append(proctor.id)
-
-                            # Calculer la durée de l'examen
-                            duration_parts = exam.duration.split('h')
-                            hours = int(duration_parts[0])
-                            minutes = int(duration_parts[1]) if len(duration_parts) > 1 and duration_parts[1] else 0
-
-                            # Créer une entrée pour le résultat
-                            results.append({
-                                'exam_id': exam.id,
-                                'room_id': room.id,
-                                'time_slot_id': time_slot.id,
-                                'start_time': time_slot.start_time,
-                                'end_time': time_slot.start_time + timedelta(hours=hours, minutes=minutes),
-                                'proctor_ids': assigned_proctors
-                            })
-            return {'status': 'success', 'results': results}
-        else:
-            return {'status': 'no_solution', 'results': []}
+            key = (exam.level, exam.department)
+            if key not in class_index:
+                class_index[key] = len(members)
+                members.append([])
+            members[class_index[key]].append(e_idx)
+        class_keys = list(class_index)
+
+        # Rang global des examens, les plus longs et les plus gros d'abord ;
+        # dans chaque classe, le prochain examen est en fin de liste (pop)
+        order = sorted(range(len(self.exams)), key=lambda e_idx: (-self.durations[e_idx], -self._participants(e_idx)))
+        rank = [0] * len(self.exams)
+        for position, e_idx in enumerate(order):
+            rank[e_idx] = position
+        for exams in members:
+            exams.sort(key=lambda e_idx: rank[e_idx], reverse=True)
+
+        remaining_by_level = {}
+        remaining_by_department = {}
+        classes_by_level = {}
+        classes_by_department = {}
+        for c_idx, (level, department) in enumerate(class_keys):
+            size = len(members[c_idx])
+            remaining_by_level[level] = remaining_by_level.get(level, 0) + size
+            remaining_by_department[department] = remaining_by_department.get(department, 0) + size
+            classes_by_level.setdefault(level, []).append(c_idx)
+            classes_by_department.setdefault(department, []).append(c_idx)
+
+        # Priorité DSatur codée dans un entier (plus petit = plus prioritaire) :
+        # saturation, puis degré restant, puis rang du plus gros examen de la classe
+        shift = max(len(self.exams), 1).bit_length() + 1
+
+        def priority(c_idx):
+            level, department = class_keys[c_idx]
+            saturation = (level_busy.get(level, 0) | department_busy.get(department, 0)).bit_count()
+            degree = remaining_by_level[level] + remaining_by_department[department]
+            return (((len(self.slots) - saturation) << shift) - degree << shift) + rank[members[c_idx][-1]]
+
+        # File de priorité paresseuse : une entrée est ignorée si la priorité de sa classe a changé
+        current = [priority(c_idx) for c_idx in range(len(class_keys))]
+        saturation_of = lambda value: value >> 2 * shift
+        heap = [(current[c_idx], c_idx) for c_idx in range(len(class_keys))]
+        heapq.heapify(heap)
+
+        schedule = []
+        while heap:
+            entry_priority, c_idx = heapq.heappop(heap)
+            if current[c_idx] != entry_priority:
+                continue
+            level, department = class_keys[c_idx]
+            e_idx = members[c_idx].pop()
+            current[c_idx] = priority(c_idx) if members[c_idx] else None
+            if current[c_idx] is not None:
+                heapq.heappush(heap, (current[c_idx], c_idx))
+            remaining_by_level[level] -= 1
+            remaining_by_department[department] -= 1
+
+            blocked = level_busy.get(level, 0) | department_busy.get(department, 0)
+            placement = self.assign_time_slot(e_idx, blocked)
+            if placement is None:
+                return {"status": "error", "message": "Impossible de créer un emploi du temps valide."}
+            t_idx, position, available, mask = placement
+            r_idx = self.room_order[position]
+            assigned_proctors = self.assign_proctors(available)
+
+            for j in self._placements(self.durations[e_idx])[t_idx][0]:
+                self.free_rooms[j] &= ~(1 << position)
+                for p_idx in assigned_proctors:
+                    self.free_proctors[j] &= ~(1 << p_idx)
+            level_busy[level] = level_busy.get(level, 0) | mask
+            department_busy[department] = department_busy.get(department, 0) | mask
+
+            # Seules les classes de même promotion ou de même filière changent de priorité ;
+            # on ne les replace dans la file que si leur saturation a changé (le degré
+            # restant n'est qu'un départage et peut rester approché)
+            for other in classes_by_level[level] + classes_by_department[department]:
+                if current[other] is not None:
+                    updated = priority(other)
+                    if saturation_of(updated) != saturation_of(current[other]):
+                        current[other] = updated
+                        heapq.heappush(heap, (updated, other))
+
+            start_time = self.slots[t_idx].start_time
+            schedule.append({
+                "exam_id": self.exams[e_idx].id,
+                "room_id": self.rooms[r_idx].id,
+                "time_slot_id": self.slots[t_idx].id,
+                "start_time": start_time,
+                "end_time": start_time + timedelta(minutes=self.durations[e_idx]),
+                "proctor_ids": [self.proctors[p_idx].id for p_idx in assigned_proctors]
+            })
+
+        return {"status": "success", "results": schedule}
+
+    def _participants(self, e_idx):
+        return getattr(self.exams[e_idx], 'participants', None) or 0
+
+    def _day_ends(self):
+        """
+        Fin de journée de chaque créneau trié : fin du dernier créneau du même jour.
+        Les créneaux n'ont qu'une heure de début, leur durée est le plus petit écart
+        entre deux créneaux d'un même jour ; sans cet écart, la journée finit à minuit.
+        """
+        days = [time_slot.start_time.date() for time_slot in self.slots]
+        gaps = [
+            self.slots[t_idx + 1].start_time - self.slots[t_idx].start_time
+            for t_idx in range(len(self.slots) - 1)
+            if days[t_idx + 1] == days[t_idx] and self.slots[t_idx + 1].start_time > self.slots[t_idx].start_time
+        ]
+        slot_length = min(gaps, default=None)
+
+        last_starts = {}
+        for day, time_slot in zip(days, self.slots):
+            last_starts[day] = time_slot.start_time
+        day_ends = []
+        for day, time_slot in zip(days, self.slots):
+            if slot_length is None:
+                midnight = time_slot.start_time.replace(hour=0, minute=0, second=0, microsecond=0)
+                day_ends.append(midnight + timedelta(days=1))
+            else:
+                day_ends.append(last_starts[day] + slot_length)
+        return day_ends
+
+    def _placements(self, minutes):
+        """
+        Pour un examen de `minutes` minutes, liste indexée par créneau de départ
+        des (indices des créneaux occupés, masque de ces créneaux), ou None si
+        l'examen dépasserait le dernier créneau de la journée (ou de la session)
+        """
+        if minutes not in self._placements_cache:
+            placements = []
+            j = 0
+            for t_idx, time_slot in enumerate(self.slots):
+                end_time = time_slot.start_time + timedelta(minutes=minutes)
+                if end_time > self.day_ends[t_idx]:
+                    placements.append(None)
+                    continue
+                j = max(j, t_idx)
+                while j < len(self.slots) and self.slots[j].start_time < end_time:
+                    j += 1
+                indices = range(t_idx, j)
+                placements.append((indices, ((1 << j) - 1) ^ ((1 << t_idx) - 1)))
+            self._placements_cache[minutes] = placements
+        return self._placements_cache[minutes]
+
+    def assign_time_slot(self, e_idx, blocked):
+        """
+        Premier créneau sans conflit de promotion/filière ayant une salle libre
+        et assez de surveillants libres
+        """
+        # Salles de capacité suffisante
+        suitable = -1 << bisect_left(self.capacities, self._participants(e_idx))
+        for t_idx, placement in enumerate(self._placements(self.durations[e_idx])):
+            if placement is None:
+                continue
+            indices, mask = placement
+            if mask & blocked:
+                continue
+            position = self.assign_room(suitable, indices)
+            if position is None:
+                continue
+            available = -1
+            for j in indices:
+                available &= self.free_proctors[j]
+            if available.bit_count() >= PROCTORS_PER_EXAM:
+                return t_idx, position, available, mask
+        return None
+
+    def assign_room(self, suitable, indices):
+        """
+        Plus petite salle parmi `suitable` libre sur tous les créneaux `indices`.
+        Retourne sa position dans room_order.
+        """
+        free = suitable
+        for j in indices:
+            free &= self.free_rooms[j]
+        if not free:
+            return None
+        return (free & -free).bit_length() - 1
+
+    def assign_proctors(self, available):
+        """Surveillants libres (masque `available`) pris à tour de rôle"""
+        assigned = []
+        # D'abord les surveillants après le dernier affecté, puis on reprend au début
+        for candidates in (available >> self.next_proctor << self.next_proctor, available):
+            while candidates and len(assigned) < PROCTORS_PER_EXAM:
+                p_idx = (candidates & -candidates).bit_length() - 1
+                candidates &= candidates - 1
+                if p_idx not in assigned:
+                    assigned.append(p_idx)
+        self.next_proctor = (assigned[-1] + 1) % len(self.proctors)
+        return assigned